@@ -1,40 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import time
-from queue import PriorityQueue
-
-# Define the Romanian map with distances (weighted graph)
-romania_map = {
-    'Arad': {'Sibiu': 140, 'Timisoara': 118, 'Zerind': 75},
-    'Zerind': {'Arad': 75, 'Oradea': 71},
-    'Oradea': {'Zerind': 71, 'Sibiu': 151},
-    'Timisoara': {'Arad': 118, 'Lugoj': 111},
-    'Lugoj': {'Timisoara': 111, 'Mehadia': 70},
-    'Mehadia': {'Lugoj': 70, 'Drobeta': 75},
-    'Drobeta': {'Mehadia': 75, 'Craiova': 120},
-    'Craiova': {'Drobeta': 120, 'Rimnicu Vilcea': 146, 'Pitesti': 138},
-    'Sibiu': {'Arad': 140, 'Oradea': 151, 'Fagaras': 99, 'Rimnicu Vilcea': 80},
-    'Rimnicu Vilcea': {'Sibiu': 80, 'Craiova': 146, 'Pitesti': 97},
-    'Fagaras': {'Sibiu': 99, 'Bucharest': 211},
-    'Pitesti': {'Rimnicu Vilcea': 97, 'Craiova': 138, 'Bucharest': 101},
-    'Bucharest': {'Fagaras': 211, 'Pitesti': 101, 'Giurgiu': 90, 'Urziceni': 85},
-    'Giurgiu': {'Bucharest': 90},
-    'Urziceni': {'Bucharest': 85, 'Hirsova': 98, 'Vaslui': 142},
-    'Hirsova': {'Urziceni': 98, 'Eforie': 86},
-    'Eforie': {'Hirsova': 86},
-    'Vaslui': {'Urziceni': 142, 'Iasi': 92},
-    'Iasi': {'Vaslui': 92, 'Neamt': 87},
-    'Neamt': {'Iasi': 87}
-}
-
-# Define positions for each city for visualization purposes
-city_positions = {
-    'Arad': (50, 300), 'Zerind': (70, 200), 'Oradea': (90, 120), 'Timisoara': (100, 400),
-    'Lugoj': (150, 500), 'Mehadia': (200, 600), 'Drobeta': (250, 700), 'Craiova': (350, 650),
-    'Sibiu': (150, 200), 'Rimnicu Vilcea': (250, 300), 'Fagaras': (300, 200), 'Pitesti': (400, 400),
-    'Bucharest': (500, 300), 'Giurgiu': (550, 400), 'Urziceni': (550, 200), 'Hirsova': (650, 150),
-    'Eforie': (700, 100), 'Vaslui': (650, 250), 'Iasi': (600, 300), 'Neamt': (550, 350)
-}
+import os
+
+from romania_data import romania_map, city_positions
+from k_shortest import k_shortest_paths
+from map_renderer import MapRenderer
+from route_engine import Graph
+from route_table import RouteTable
+import route_engine
+
+# Map data lives in romania_data so the routing code can be used without Tk
+road_graph = Graph.from_dict(romania_map, city_positions)
+
+# All-pairs table for instant queries, rebuilt only when the map changes
+TABLE_PREFIX = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".route_cache", "romania")
+route_table = RouteTable.load_or_build(road_graph, TABLE_PREFIX)
 
 # Create the Tkinter GUI window
 window = tk.Tk()
@@ -60,47 +40,51 @@ end_menu = ttk.Combobox(control_frame, textvariable=end_var, values=list(romania
 end_menu.set("Select Destination City")
 end_menu.grid(row=0, column=3, padx=5)
 
+# Dropdown for the search method
+method_var = tk.StringVar(value="table")
+method_label = tk.Label(control_frame, text="Method:")
+method_label.grid(row=0, column=4, padx=5)
+method_menu = ttk.Combobox(control_frame, textvariable=method_var, values=["table"] + list(route_engine.METHODS), state="readonly")
+method_menu.grid(row=0, column=5, padx=5)
+
+# Number of alternative routes to list
+routes_var = tk.IntVar(value=3)
+routes_label = tk.Label(control_frame, text="Routes:")
+routes_label.grid(row=0, column=6, padx=5)
+routes_spinbox = tk.Spinbox(control_frame, from_=1, to=5, width=3, textvariable=routes_var)
+routes_spinbox.grid(row=0, column=7, padx=5)
+
 # Button to start the search
 search_button = tk.Button(control_frame, text="Find Shortest Path", command=lambda: show_shortest_path())
-search_button.grid(row=0, column=4, padx=5)
+search_button.grid(row=0, column=8, padx=5)
+
+# Ranked list of alternative routes; selecting one highlights it on the map
+alternatives = []
+alternatives_list = tk.Listbox(window, height=5, width=120)
+alternatives_list.pack(pady=5)
 
 # Canvas to draw the map
 canvas = tk.Canvas(window, width=800, height=800, bg="white")
 canvas.pack()
 
-# Draw cities and roads
-for city, neighbors in romania_map.items():
-    x, y = city_positions[city]
-    canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="black", tags=city)
-    canvas.create_text(x, y - 15, text=city, font=("Arial", 10))
+# Draw cities and roads; only the visible part of the map is drawn, and the
+# view can be panned by dragging and zoomed with the mouse wheel
+renderer = MapRenderer(canvas, road_graph)
+renderer.schedule_redraw()
 
-    # Draw roads (edges)
-    for neighbor, distance in neighbors.items():
-        nx, ny = city_positions[neighbor]
-        canvas.create_line(x, y, nx, ny, fill="gray", tags=f"{city}-{neighbor}")
-
-# Dijkstra's algorithm to find the shortest path
+# Dijkstra's algorithm to find the shortest path (see route_engine)
 def dijkstra(graph, start, goal):
-    queue = PriorityQueue()
-    queue.put((0, start, [start]))  # (distance, current_city, path)
-    visited = set()
-
-    while not queue.empty():
-        (dist, current, path) = queue.get()
-        if current in visited:
-            continue
-        visited.add(current)
-
-        # Goal found
-        if current == goal:
-            return path, dist
+    road = road_graph if graph is romania_map else Graph.from_dict(graph)
+    route = route_engine.dijkstra(road, start, goal)
+    return route.path, route.distance
 
-        # Explore neighbors
-        for neighbor, distance in graph[current].items():
-            if neighbor not in visited:
-                queue.put((dist + distance, neighbor, path + [neighbor]))
+# Highlight the alternative route picked in the list
+def show_alternative(event):
+    selection = alternatives_list.curselection()
+    if selection:
+        renderer.animate_route(alternatives[selection[0]].path, delay=200)
 
-    return None, float('inf')  # No path found
+alternatives_list.bind("<<ListboxSelect>>", show_alternative)
 
 # Start the search and display the path
 def show_shortest_path():
@@ -111,26 +95,29 @@ def show_shortest_path():
         messagebox.showerror("Error", "Please select both start and destination cities.")
         return
 
-    # Run Dijkstra's algorithm to find the shortest path
-    path, total_distance = dijkstra(romania_map, start, end)
+    # Run the selected search method to find the shortest path
+    if method_var.get() == "table":
+        route = route_table.route(start, end)
+    else:
+        route = route_engine.shortest_path(road_graph, start, end, method_var.get())
+    path, total_distance = route.path, route.distance
+
+    # Fill the ranked list with the best few loopless routes
+    alternatives.clear()
+    alternatives_list.delete(0, tk.END)
+    if path is not None:
+        alternatives.extend(k_shortest_paths(road_graph, start, end, routes_var.get()))
+    for rank, alternative in enumerate(alternatives, start=1):
+        alternatives_list.insert(tk.END, f"{rank}. {alternative.distance} km: {' -> '.join(alternative.path)}")
 
     if path is None:
         messagebox.showinfo("Result", f"No path found from {start} to {end}")
     else:
-        # Display the path visually
-        for i in range(len(path) - 1):
-            city = path[i]
-            next_city = path[i + 1]
-
-            # Highlight cities and roads in the path
-            canvas.itemconfig(city, fill="blue")
-            canvas.itemconfig(f"{city}-{next_city}", fill="blue")
-            canvas.itemconfig(f"{next_city}-{city}", fill="blue")
-            window.update()
-            time.sleep(0.5)
-
-        # Show total distance in a message box
-        messagebox.showinfo("Result", f"Shortest path from {start} to {end}: {' -> '.join(path)}\nTotal distance: {total_distance} km")
+        # Display the path visually, then show the total distance
+        def show_result():
+            messagebox.showinfo("Result", f"Shortest path from {start} to {end}: {' -> '.join(path)}\nTotal distance: {total_distance} km\nCities expanded: {route.expanded}")
+
+        renderer.animate_route(path, delay=500, on_done=show_result)
 
 # Run the GUI
 window.mainloop()
@@ -1,15 +1,23 @@
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
-import random
+
+from gomoku import new_board
+from ttt_tournament import STRATEGIES, make_player, result
 
 # Initialize the main application
 root = tk.Tk()
 root.title("Tic-Tac-Toe: Player vs Computer")
 
-# Initialize game variables
-current_player = 'X'  # Player 'X' goes first
-board = [['_' for _ in range(3)] for _ in range(3)]
-buttons = [[None for _ in range(3)] for _ in range(3)]
+# Initialize game variables; the rules and the computer players live in the
+# same core the headless tournaments use (ttt_tournament).  'X' goes first;
+# set_board() chooses the board size and the opponent
+rows, cols, k = 3, 3, 3
+game = new_board(rows, cols, k)
+buttons = []
+
+# Messages go to a status line under the board instead of dialog boxes
+status = tk.Label(root, text="")
 
 # Game stats
 user_wins = 0
@@ -17,104 +25,128 @@ computer_wins = 0
 draws = 0
 rounds_left = 0
 
-# Function to check if there's a winner
-def check_winner():
-    # Check rows, columns, and diagonals
-    for i in range(3):
-        if board[i][0] == board[i][1] == board[i][2] != '_':
-            return board[i][0]
-        if board[0][i] == board[1][i] == board[2][i] != '_':
-            return board[0][i]
-    if board[0][0] == board[1][1] == board[2][2] != '_':
-        return board[0][0]
-    if board[0][2] == board[1][1] == board[2][0] != '_':
-        return board[0][2]
-    return None
-
-# Function to check if the board is full (draw)
-def is_board_full():
-    for row in board:
-        if '_' in row:
-            return False
-    return True
+# Computer opponent: "minimax" is the perfect value table on 3x3 and the
+# Gomoku alpha-beta search on larger boards
+computer = None
+opponent = "minimax"
+MOVE_TIME_MS = 500  # how long search players may think, so the window stays responsive
+ROUND_PAUSE_MS = 1500  # time to look at a finished board before the next round
+MAX_SIZE = 19
+POLL_MS = 50  # how often to look for the computer's move while it thinks
+
+# The computer searches on a worker thread, on its own copy of the board, so
+# the window keeps redrawing and answering clicks while it thinks
+searcher = ThreadPoolExecutor(max_workers=1)
 
 # Function to handle player's move
 def player_move(row, col):
-    global current_player
+    if game.is_over() or game.player != 'X':
+        return  # Wait for the computer
+    if game.is_free(row * cols + col):
+        buttons[row][col]['text'] = game.player
+        game.make(row * cols + col)
 
-    if board[row][col] == '_':
-        board[row][col] = current_player
-        buttons[row][col]['text'] = current_player
+        outcome = result(game)
 
-        winner = check_winner()
-
-        if winner:
-            end_game(winner)
-        elif is_board_full():
-            end_game(None)  # Draw
+        if outcome:
+            end_game(outcome)
         else:
-            # Switch to computer's turn
-            current_player = 'O'
+            status['text'] = "Computer is thinking..."
             # Schedule computer's move after a short delay
             root.after(500, computer_move)  # 500 milliseconds (0.5 seconds) delay
     else:
-        messagebox.showwarning("Invalid Move", "This space is already selected.")
+        status['text'] = "This space is already selected."
 
-# Function for computer's move
+# Function for computer's move: start the search and wait for it
 def computer_move():
-    available_moves = [(i, j) for i in range(3) for j in range(3) if board[i][j] == '_']
-    if available_moves:
-        move = random.choice(available_moves)
-        board[move[0]][move[1]] = current_player
-        buttons[move[0]][move[1]]['text'] = current_player
-
-        # Display computer's move to the user
-        messagebox.showinfo("Computer Move", f"Computer placed 'O' at ({move[0]+1}, {move[1]+1})")
-
-        winner = check_winner()
-
-        if winner:
-            end_game(winner)
-        elif is_board_full():
-            end_game(None)  # Draw
-        else:
-            # Switch back to player's turn
-            current_player = 'X'
-
-# Function to handle the end of a game
-def end_game(winner):
+    if game.legal_moves():
+        position = new_board(rows, cols, k)
+        for i in game.history:
+            position.make(i)
+        root.after(POLL_MS, place_computer_move, searcher.submit(computer.choose_move, position))
+
+# Function to play the computer's move once its search has finished
+def place_computer_move(search):
+    if not search.done():
+        root.after(POLL_MS, place_computer_move, search)
+        return
+    move = search.result()
+    buttons[move[0]][move[1]]['text'] = game.player
+    game.make(move[0] * cols + move[1])
+
+    # Display computer's move to the user
+    status['text'] = f"Computer placed 'O' at ({move[0]+1}, {move[1]+1}). Your move."
+
+    outcome = result(game)
+
+    if outcome:
+        end_game(outcome)
+
+# Function to handle the end of a game ('X', 'O' or 'draw')
+def end_game(outcome):
     global user_wins, computer_wins, draws, rounds_left
 
-    if winner == 'X':
+    if outcome == 'X':
         user_wins += 1
-        messagebox.showinfo("Game Over", "You win!")
-    elif winner == 'O':
+        message = "You win!"
+    elif outcome == 'O':
         computer_wins += 1
-        messagebox.showinfo("Game Over", "Computer wins!")
+        message = "Computer wins!"
     else:
         draws += 1
-        messagebox.showinfo("Game Over", "It's a draw!")
+        message = "It's a draw!"
 
     rounds_left -= 1
     if rounds_left > 0:
-        reset_game()
+        status['text'] = f"{message} You {user_wins}, computer {computer_wins}, draws {draws}. Next round..."
+        root.after(ROUND_PAUSE_MS, reset_game)
     else:
-        show_final_scores()
+        show_final_scores(message)
 
 # Function to show final scores after all rounds are done
-def show_final_scores():
-    score_message = f"Final Scores:\n\nYou: {user_wins}\nComputer: {computer_wins}\nDraws: {draws}"
-    messagebox.showinfo("Final Scores", score_message)
+def show_final_scores(message):
+    status['text'] = f"{message} Final scores: you {user_wins}, computer {computer_wins}, draws {draws}."
     reset_all()
 
 # Function to reset the game board for a new round
 def reset_game():
-    global board, current_player
-    board = [['_' for _ in range(3)] for _ in range(3)]
-    current_player = 'X'
-    for i in range(3):
-        for j in range(3):
+    game.reset()
+    for i in range(rows):
+        for j in range(cols):
             buttons[i][j]['text'] = '_'
+    status['text'] = "Your move (X)."
+
+# Function to switch to a rows x cols board where k in a row wins, against
+# the named computer strategy
+def set_board(new_rows, new_cols, new_k, strategy):
+    global rows, cols, k, game, computer, opponent, buttons
+    rows, cols, k, opponent = new_rows, new_cols, new_k, strategy
+    game = new_board(rows, cols, k)
+    close_computer()
+    computer = make_player(strategy, rows, cols, k, budget_ms=MOVE_TIME_MS)
+    for row in buttons:
+        for button in row:
+            button.destroy()
+    # Keep big boards on screen by shrinking the buttons
+    width, height = (10, 3) if max(rows, cols) <= 5 else (2, 1)
+    buttons = [[None for _ in range(cols)] for _ in range(rows)]
+    for i in range(rows):
+        for j in range(cols):
+            buttons[i][j] = tk.Button(root, text='_', width=width, height=height,
+                                      command=lambda i=i, j=j: player_move(i, j))
+            buttons[i][j].grid(row=i, column=j)
+    status.grid(row=rows, column=0, columnspan=cols)
+
+# Function to release the computer player's worker processes, if it has any
+def close_computer():
+    if hasattr(computer, "close"):
+        computer.close()
+
+# Function to close the window: let a running search finish, then clean up
+def close_window():
+    searcher.shutdown()
+    close_computer()
+    root.destroy()
 
 # Function to reset all variables and start a new set of rounds
 def reset_all():
@@ -133,12 +165,19 @@ def prompt_rounds():
             rounds = int(round_input.get())
             if rounds <= 0:
                 raise ValueError
-            global rounds_left
-            rounds_left = rounds
-            rounds_window.destroy()
-            reset_game()
+            new_rows, new_cols, new_k = int(rows_input.get()), int(cols_input.get()), int(k_input.get())
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter a valid number of rounds.")
+            return
+        if not (3 <= new_rows <= MAX_SIZE and 3 <= new_cols <= MAX_SIZE and 3 <= new_k <= max(new_rows, new_cols)):
+            messagebox.showerror("Invalid Input",
+                                 f"Rows and columns must be 3 to {MAX_SIZE}, and k in a row 3 to the longer side.")
+            return
+        global rounds_left
+        rounds_left = rounds
+        rounds_window.destroy()
+        set_board(new_rows, new_cols, new_k, strategy.get())
+        reset_game()
 
     rounds_window = tk.Toplevel(root)
     rounds_window.title("Choose Rounds")
@@ -146,14 +185,23 @@ def prompt_rounds():
     tk.Label(rounds_window, text="Enter number of rounds:").pack(pady=10)
     round_input = tk.Entry(rounds_window)
     round_input.pack(pady=10)
+    # Board size; 3 x 3 with 3 in a row is classic Tic-Tac-Toe, 15 x 15 with 5 is Gomoku
+    size_entries = []
+    for label, value in (("Rows:", rows), ("Columns:", cols), ("In a row to win:", k)):
+        tk.Label(rounds_window, text=label).pack()
+        entry = tk.Entry(rounds_window)
+        entry.insert(0, str(value))
+        entry.pack(pady=2)
+        size_entries.append(entry)
+    rows_input, cols_input, k_input = size_entries
+    tk.Label(rounds_window, text="Computer:").pack()
+    strategy = tk.StringVar(rounds_window, value=opponent)
+    tk.OptionMenu(rounds_window, strategy, *STRATEGIES).pack(pady=2)
     tk.Button(rounds_window, text="Start", command=set_rounds).pack(pady=10)
 
 # Create the Tic-Tac-Toe board buttons
-for i in range(3):
-    for j in range(3):
-        buttons[i][j] = tk.Button(root, text='_', width=10, height=3,
-                                  command=lambda i=i, j=j: player_move(i, j))
-        buttons[i][j].grid(row=i, column=j)
+set_board(3, 3, 3, opponent)
+root.protocol("WM_DELETE_WINDOW", close_window)
 
 # Start by prompting the user for the number of rounds
 prompt_rounds()
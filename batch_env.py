@@ -0,0 +1,119 @@
+import argparse
+import time
+
+import numpy as np
+
+from grid_state import CLEAN, DIRT, OBSTACLE
+import vacuum_sim
+from vacuum_sim import CHUNK, random_walk_episode
+
+DX = np.array(vacuum_sim.DX)
+DY = np.array(vacuum_sim.DY)
+
+
+# N rooms of the same size stepped together.  cells[i] is room i's grid
+# (indexed [y, x] like GridState.cells) and x, y, cleaned_dirt, energy_used
+# hold every agent's state.  move() applies Agent.move and check_for_dirt to
+# all rooms at once.
+class BatchEnvironment:
+    def __init__(self, width, height, count):
+        self.width = width
+        self.height = height
+        self.count = count
+        self.cells = np.zeros((count, height, width), dtype=np.uint8)
+        self.x = np.ones(count, dtype=np.int64)
+        self.y = np.ones(count, dtype=np.int64)
+        self.cleaned_dirt = np.zeros(count, dtype=np.int64)
+        self.energy_used = np.zeros(count, dtype=np.int64)
+        # Start of each room in the flattened cells array
+        self.base = np.arange(count, dtype=np.int64) * (width * height)
+
+    @classmethod
+    def from_environments(cls, envs):
+        """Batch holding copies of the grids of Environment objects."""
+        batch = cls(envs[0].width, envs[0].height, len(envs))
+        for i, env in enumerate(envs):
+            batch.cells[i] = env.grid.cells
+        return batch
+
+    def move(self, directions):
+        """One step for every room; directions are indices into DIRECTIONS."""
+        flat = self.cells.reshape(-1)
+        width, height = self.width, self.height
+        nx = self.x + DX[directions]
+        ny = self.y + DY[directions]
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        # Out-of-bounds targets look up cell 0 of their room, then get masked
+        target = self.base + np.where(inside, ny * width + nx, 0)
+        valid = inside & (flat[target] != OBSTACLE)
+        self.x = np.where(valid, nx, self.x)
+        self.y = np.where(valid, ny, self.y)
+
+        here = self.base + self.y * width + self.x
+        dirt = flat[here] == DIRT
+        flat[here[dirt]] = CLEAN
+        self.cleaned_dirt += dirt
+        self.energy_used += 1 + 2 * dirt
+
+    def dirt_left(self):
+        return np.count_nonzero(self.cells.reshape(self.count, -1) == DIRT, axis=1)
+
+
+# Random walks in a batch of rooms.  Room i, its walk and all the counters
+# are identical to random_walk_episode(width, height, seeds[i]) stepped the
+# same number of times: each room keeps its own generator and draws its
+# directions in the same CHUNK-sized blocks as RandomWalk.step.
+class BatchRandomWalk:
+    def __init__(self, width, height, seeds):
+        episodes = [random_walk_episode(width, height, seed) for seed in seeds]
+        self.env = BatchEnvironment.from_environments([episode.env for episode in episodes])
+        self.rngs = [episode.rng for episode in episodes]
+        self.steps = 0
+
+    def step(self, n=1):
+        while n > 0:
+            count = min(n, CHUNK)
+            directions = np.empty((count, self.env.count), dtype=np.uint8)
+            for i, rng in enumerate(self.rngs):
+                directions[:, i] = rng.integers(0, 4, count, dtype=np.uint8)
+            for row in directions:
+                self.env.move(row)
+            self.steps += count
+            n -= count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step many random-walk rooms at once and check them against the scalar agent")
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=10, help="room width and height")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--check", type=int, default=20, help="rooms to replay with the scalar agent")
+    args = parser.parse_args()
+
+    seeds = list(range(args.rooms))
+    batch = BatchRandomWalk(args.size, args.size, seeds)
+    started = time.perf_counter()
+    batch.step(args.steps)
+    elapsed = time.perf_counter() - started
+    total = args.rooms * args.steps
+    env = batch.env
+    print(f"batch: {args.rooms} rooms x {args.steps} steps in {elapsed:.2f} s ({total / elapsed:,.0f} room-steps/s)")
+    print(f"mean cleaned {env.cleaned_dirt.mean():.2f}, mean energy {env.energy_used.mean():.1f}")
+
+    started = time.perf_counter()
+    for i in seeds[:args.check]:
+        walk = random_walk_episode(args.size, args.size, i)
+        walk.step(args.steps)
+        agent = walk.agent
+        state = (agent.x, agent.y, agent.cleaned_dirt, agent.energy_used)
+        if state != (env.x[i], env.y[i], env.cleaned_dirt[i], env.energy_used[i]) \
+                or not np.array_equal(walk.env.grid.cells, env.cells[i]):
+            raise SystemExit(f"room {i} differs from the scalar agent")
+    elapsed = time.perf_counter() - started
+    if args.check:
+        scalar = args.check * args.steps / elapsed
+        print(f"scalar: {args.check} rooms match exactly ({scalar:,.0f} room-steps/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import random
+import time
+
+from bench_distance_matrix import grid_graph
+from k_shortest import k_shortest_paths
+from route_engine import dijkstra
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark k_shortest_paths() against k")
+    parser.add_argument("--side", type=int, default=100, help="grid side length (nodes = side^2)")
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 2, 3, 5, 8])
+    args = parser.parse_args()
+
+    graph = grid_graph(args.side)
+    rng = random.Random(1)
+    pairs = [tuple(rng.sample(graph.names, 2)) for _ in range(args.queries)]
+    print(f"{len(graph)} nodes, {graph.edge_count()} edges, {args.queries} queries")
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        dijkstra(graph, a, b)
+    single = (time.perf_counter() - start) / len(pairs)
+    print(f"one dijkstra():  {single * 1000:8.1f} ms/query")
+
+    for k in args.k:
+        expanded = 0
+        start = time.perf_counter()
+        for a, b in pairs:
+            expanded += sum(route.expanded for route in k_shortest_paths(graph, a, b, k))
+        elapsed = (time.perf_counter() - start) / len(pairs)
+        print(f"k={k:2d}:  {elapsed * 1000:8.1f} ms/query  ({elapsed / single:5.1f}x dijkstra)"
+              f"  spur expansions/query {expanded / len(pairs):9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+
+from dirt_index import DirtIndex
+
+
+# The original VacuumCleanerApp.find_closest_dirty_cell: scan every cell
+def linear_nearest(dirty_cells, row, col):
+    closest_cell = None
+    min_distance = float('inf')
+    for dirty_row, dirty_col in dirty_cells:
+        distance = abs(row - dirty_row) + abs(col - dirty_col)
+        if distance < min_distance:
+            min_distance = distance
+            closest_cell = (dirty_row, dirty_col)
+    return closest_cell
+
+
+# Greedy cleaning run like auto_clean: jump to the nearest dirty cell and
+# clean it until none are left; returns total Manhattan steps
+def clean_linear(cells):
+    dirty = list(cells)
+    row = col = steps = 0
+    while dirty:
+        target = linear_nearest(dirty, row, col)
+        steps += abs(target[0] - row) + abs(target[1] - col)
+        row, col = target
+        dirty.remove(target)
+    return steps
+
+
+def clean_indexed(cells):
+    dirty = DirtIndex(cells)
+    row = col = steps = 0
+    while dirty:
+        target = dirty.nearest(row, col)
+        steps += abs(target[0] - row) + abs(target[1] - col)
+        row, col = target
+        dirty.remove(target)
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DirtIndex against the linear nearest-cell scan")
+    parser.add_argument("--sides", type=int, nargs="+", default=[50, 100, 200, 400, 1000])
+    parser.add_argument("--density", type=float, default=0.1, help="fraction of cells that are dirty")
+    parser.add_argument("--linear-limit", type=int, default=20000,
+                        help="skip the linear scan above this many dirty cells")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for side in args.sides:
+        count = max(1, int(side * side * args.density))
+        cells = rng.sample([(r, c) for r in range(side) for c in range(side)], count)
+
+        start = time.perf_counter()
+        indexed_steps = clean_indexed(cells)
+        indexed = time.perf_counter() - start
+
+        if count <= args.linear_limit:
+            start = time.perf_counter()
+            linear_steps = clean_linear(cells)
+            linear = time.perf_counter() - start
+            # Ties may be broken differently, so the tours need not match exactly
+            result = f"linear {linear:8.3f} s  speedup {linear / indexed:7.1f}x  (steps {linear_steps} vs {indexed_steps})"
+        else:
+            result = "linear skipped"
+        print(f"{side:5d}x{side:<5d} {count:7d} dirty  index {indexed:7.3f} s  {result}")
+
+
+if __name__ == "__main__":
+    main()
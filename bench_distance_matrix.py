@@ -0,0 +1,58 @@
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from distance_matrix import distance_matrix
+from route_engine import Graph
+
+
+# Square grid road network with random weights, a stand-in for a city map
+def grid_graph(side, seed=0):
+    rng = random.Random(seed)
+    names = [str(i) for i in range(side * side)]
+    edges = []
+    for i in range(side * side):
+        x, y = i % side, i // side
+        if x + 1 < side:
+            w = rng.randint(1, 100)
+            edges += [(i, i + 1, w), (i + 1, i, w)]
+        if y + 1 < side:
+            w = rng.randint(1, 100)
+            edges += [(i, i + side, w), (i + side, i, w)]
+    return Graph.from_edges(names, edges)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark distance_matrix() from 1 to N worker processes")
+    parser.add_argument("--side", type=int, default=150, help="grid side length (nodes = side^2)")
+    parser.add_argument("--origins", type=int, default=200)
+    parser.add_argument("--destinations", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    graph = grid_graph(args.side)
+    rng = random.Random(1)
+    origins = rng.sample(graph.names, args.origins)
+    destinations = rng.sample(graph.names, args.destinations)
+    print(f"{len(graph)} nodes, {graph.edge_count()} edges, {args.origins} x {args.destinations} matrix")
+
+    baseline = None
+    reference = None
+    workers = 1
+    while workers <= args.max_workers:
+        start = time.perf_counter()
+        matrix = distance_matrix(graph, origins, destinations, workers=workers)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference, baseline = matrix, elapsed
+        elif not np.array_equal(matrix, reference):
+            raise SystemExit(f"Results differ with {workers} workers")
+        print(f"workers={workers:3d}  {elapsed:8.3f} s  speedup {baseline / elapsed:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import time
+
+import numpy as np
+
+from flow_field import PlanningAgent
+from vacuum_sim import Environment, RandomWalk
+
+
+def make_env(size, density, seed):
+    cells = size * size
+    dirt = max(1, int(cells * density))
+    return Environment(size, size, np.random.default_rng(seed), dirt_count=dirt, obstacle_count=cells // 10)
+
+
+def run_planner(env, incremental=True):
+    agent = PlanningAgent(env, incremental)
+    started = time.perf_counter()
+    while not agent.done:
+        agent.step(1000)
+    return agent, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Energy per cleaned dirt: flow-field planner against the random walk")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 50, 100])
+    parser.add_argument("--density", type=float, default=0.02, help="fraction of cells that start dirty")
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--walk-factor", type=int, default=20,
+                        help="random walk gets this many times the planner's steps")
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'planner E/dirt':>15} {'walk E/dirt':>12} {'walk cleaned':>13} "
+          f"{'incremental':>12} {'rebuild':>9}")
+    for size in args.sizes:
+        planned = walked = walk_cleaned = dirt_total = 0.0
+        planned_energy = walked_energy = 0
+        incremental_time = rebuild_time = 0.0
+        for seed in range(args.episodes):
+            agent, elapsed = run_planner(make_env(size, args.density, seed))
+            incremental_time += elapsed
+            planned += agent.cleaned_dirt
+            planned_energy += agent.energy_used
+
+            _, elapsed = run_planner(make_env(size, args.density, seed), incremental=False)
+            rebuild_time += elapsed
+
+            # Same room, random directions, for a multiple of the planner's steps
+            env = make_env(size, args.density, seed)
+            dirt_total += env.grid.dirt_count()
+            walk = RandomWalk(env, seed=seed)
+            walk.step(args.walk_factor * agent.steps)
+            walked += walk.agent.cleaned_dirt
+            walked_energy += walk.agent.energy_used
+            walk_cleaned += walk.agent.cleaned_dirt
+
+        print(f"{size:4d}x{size:<4d} {planned_energy / max(planned, 1):15.2f} "
+              f"{walked_energy / max(walked, 1):12.2f} {walk_cleaned / dirt_total:12.1%} "
+              f"{incremental_time:10.3f} s {rebuild_time:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
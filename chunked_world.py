@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from grid_state import CLEAN, DIRT, OBSTACLE
+from vacuum_sim import Environment, RandomWalk
+
+TILE_BITS = 6  # 64 x 64 cells per tile
+
+
+# One row of a ChunkedGrid; indexing it reads or writes a single cell
+class _Row:
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.y = y
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x):
+        return self.grid.get(x, self.y)
+
+    def __setitem__(self, x, value):
+        self.grid.set(x, self.y, value)
+
+
+# Room grid for maps far too large to allocate densely.  The map is cut into
+# square tiles that are allocated the first time a cell in them becomes
+# dirty or an obstacle; a missing tile is all clean, and a tile whose last
+# non-clean cell is cleaned is dropped again.  It answers the same per-cell
+# calls as GridState (get, set, is_dirt, is_obstacle, clean, randomize,
+# dirty_cells, ...), so Environment and TourCleaner work on it unchanged.
+#
+# With a path the tiles live in a memory-mapped file laid out tile by tile.
+# The file is created sparse, so only tiles that were written take up disk
+# space; flush() saves the list of used tiles next to it for open().
+class ChunkedGrid:
+    def __init__(self, width, height, tile_bits=TILE_BITS, path=None):
+        self.width = width
+        self.height = height
+        self.tile_bits = tile_bits
+        self.tile = 1 << tile_bits
+        self.mask = self.tile - 1
+        self.tiles_x = -(-width // self.tile)
+        self.tiles_y = -(-height // self.tile)
+        self.tiles = {}  # (tile row, tile column) -> tile x tile uint8 array
+        self.flat = {}   # same tiles as flat memoryviews, for single cells
+        self.used = {}   # non-clean cells per tile
+        self.path = path
+        self.backing = None
+        if path is not None:
+            self.backing = np.memmap(path, dtype=np.uint8, mode="w+",
+                                     shape=(self.tiles_y, self.tiles_x, self.tile, self.tile))
+
+    @classmethod
+    def open(cls, path):
+        """Reopen a file-backed grid saved with flush()."""
+        with open(path + ".json") as meta:
+            header = json.load(meta)
+        grid = cls(header["width"], header["height"], header["tile_bits"])
+        grid.path = path
+        grid.backing = np.memmap(path, dtype=np.uint8, mode="r+",
+                                 shape=(grid.tiles_y, grid.tiles_x, grid.tile, grid.tile))
+        for ty, tx in header["tiles"]:
+            tile = grid._allocate((ty, tx))
+            grid.used[ty, tx] = int(np.count_nonzero(tile))
+        return grid
+
+    def flush(self):
+        if self.backing is None:
+            raise ValueError("only file-backed grids can be flushed")
+        self.backing.flush()
+        with open(self.path + ".json", "w") as meta:
+            json.dump({"width": self.width, "height": self.height, "tile_bits": self.tile_bits,
+                       "tiles": sorted(self.tiles)}, meta)
+
+    def _allocate(self, key):
+        if self.backing is not None:
+            # Plain ndarray view: slicing np.memmap itself is much slower
+            tile = self.backing.view(np.ndarray)[key]
+        else:
+            tile = np.zeros((self.tile, self.tile), dtype=np.uint8)
+        self.tiles[key] = tile
+        self.flat[key] = memoryview(tile.reshape(-1))
+        self.used[key] = 0
+        return tile
+
+    def _release(self, key):
+        del self.tiles[key]
+        del self.flat[key]
+        del self.used[key]
+
+    def get(self, x, y):
+        bits = self.tile_bits
+        tile = self.flat.get((y >> bits, x >> bits))
+        if tile is None:
+            return CLEAN
+        return tile[((y & self.mask) << bits) | (x & self.mask)]
+
+    def set(self, x, y, value):
+        bits = self.tile_bits
+        key = (y >> bits, x >> bits)
+        tile = self.flat.get(key)
+        if tile is None:
+            if value == CLEAN:
+                return
+            self._allocate(key)
+            tile = self.flat[key]
+        i = ((y & self.mask) << bits) | (x & self.mask)
+        old = tile[i]
+        if old == value:
+            return
+        tile[i] = value
+        if old == CLEAN:
+            self.used[key] += 1
+        elif value == CLEAN:
+            self.used[key] -= 1
+            if not self.used[key]:
+                self._release(key)
+
+    def __getitem__(self, y):
+        # Row access, so grid[y][x] keeps working without copying the row
+        return _Row(self, y)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_dirt(self, x, y):
+        return self.get(x, y) == DIRT
+
+    def is_obstacle(self, x, y):
+        return self.get(x, y) == OBSTACLE
+
+    def clean(self, x, y):
+        self.set(x, y, CLEAN)
+
+    def _scatter(self, cells, value, only_clean=False):
+        # Set many flat cell numbers at once, tile by tile
+        if not len(cells):
+            return
+        bits, mask = self.tile_bits, self.mask
+        ys, xs = np.divmod(cells, self.width)
+        keys = (ys >> bits) * self.tiles_x + (xs >> bits)
+        order = np.argsort(keys, kind="stable")
+        keys, ys, xs = keys[order], ys[order], xs[order]
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        for start, end in zip(np.r_[0, bounds].tolist(), np.r_[bounds, len(keys)].tolist()):
+            key = divmod(int(keys[start]), self.tiles_x)
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = self._allocate(key)
+            rows, cols = ys[start:end] & mask, xs[start:end] & mask
+            if only_clean:
+                keep = tile[rows, cols] == CLEAN
+                rows, cols = rows[keep], cols[keep]
+            tile[rows, cols] = value
+            self.used[key] = int(np.count_nonzero(tile))
+            if not self.used[key]:
+                self._release(key)
+
+    def randomize(self, dirt_count, obstacle_count, rng=None, distinct=False):
+        """Scatter dirt, then obstacles on cells that are still clean; the
+        same rules as GridState.randomize."""
+        if rng is None:
+            rng = np.random.default_rng()
+        size = self.width * self.height
+        if distinct:
+            dirt = rng.choice(size, size=min(dirt_count, size), replace=False)
+        else:
+            dirt = rng.integers(0, size, dirt_count)
+        self._scatter(dirt, DIRT)
+        self._scatter(rng.integers(0, size, obstacle_count), OBSTACLE, only_clean=True)
+
+    def dirty_cells(self):
+        """List of (row, col) for every dirty cell."""
+        cells = []
+        for (ty, tx), tile in self.tiles.items():
+            for row, col in np.argwhere(tile == DIRT).tolist():
+                cells.append(((ty << self.tile_bits) + row, (tx << self.tile_bits) + col))
+        return cells
+
+    def dirt_count(self):
+        return sum(int(np.count_nonzero(tile == DIRT)) for tile in self.tiles.values())
+
+    def window(self, x, y, width, height):
+        """Dense copy of the cells in a rectangle, indexed [y, x], for viewers."""
+        out = np.zeros((height, width), dtype=np.uint8)
+        bits = self.tile_bits
+        for ty in range(y >> bits, ((y + height - 1) >> bits) + 1):
+            for tx in range(x >> bits, ((x + width - 1) >> bits) + 1):
+                tile = self.tiles.get((ty, tx))
+                if tile is None:
+                    continue
+                top, left = ty << bits, tx << bits
+                y0, y1 = max(y, top), min(y + height, top + self.tile)
+                x0, x1 = max(x, left), min(x + width, left + self.tile)
+                out[y0 - y:y1 - y, x0 - x:x1 - x] = tile[y0 - top:y1 - top, x0 - left:x1 - left]
+        return out
+
+    def memory_used(self):
+        """Bytes held by allocated tiles."""
+        return len(self.tiles) * self.tile * self.tile
+
+    def copy(self):
+        other = ChunkedGrid(self.width, self.height, self.tile_bits)
+        for key, tile in self.tiles.items():
+            other._allocate(key)[...] = tile
+            other.used[key] = self.used[key]
+        return other
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random walk on a warehouse-size chunked map")
+    parser.add_argument("--size", type=int, default=100000, help="map width and height")
+    parser.add_argument("--dirt", type=int, default=10000)
+    parser.add_argument("--obstacles", type=int, default=10000)
+    parser.add_argument("--tile-bits", type=int, default=TILE_BITS, help="tiles are 2**bits cells square")
+    parser.add_argument("--steps", type=int, default=1000000)
+    parser.add_argument("--mmap", metavar="PATH", help="keep the tiles in this memory-mapped file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    grid = ChunkedGrid(args.size, args.size, args.tile_bits, args.mmap)
+    env = Environment(args.size, args.size, np.random.default_rng(0), dirt_count=args.dirt,
+                      obstacle_count=args.obstacles, grid=grid)
+    elapsed = time.perf_counter() - started
+    dense = args.size * args.size
+    print(f"{args.size}x{args.size} map randomized in {elapsed:.2f} s: {len(grid.tiles)} of "
+          f"{grid.tiles_x * grid.tiles_y} tiles allocated, {grid.memory_used() / 1e6:.1f} MB "
+          f"(dense: {dense / 1e9:.1f} GB)")
+
+    walk = RandomWalk(env, seed=0)
+    walk.agent.x = walk.agent.y = args.size // 2
+    started = time.perf_counter()
+    walk.step(args.steps)
+    elapsed = time.perf_counter() - started
+    print(f"{args.steps:,} random-walk steps in {elapsed:.2f} s ({args.steps / elapsed:,.0f} steps/s), "
+          f"cleaned {walk.agent.cleaned_dirt}")
+    if args.mmap:
+        grid.flush()
+        print(f"file {os.path.getsize(args.mmap) / 1e9:.1f} GB apparent, "
+              f"{os.stat(args.mmap).st_blocks * 512 / 1e6:.1f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
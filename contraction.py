@@ -0,0 +1,275 @@
+import heapq
+import struct
+from array import array
+
+from route_engine import NO_PARENT, Route, tidy_distance
+
+MAGIC = b"CHRT0001"
+HEADER = struct.Struct("<8sqqq")  # magic, nodes, upward edges, downward edges
+
+# Witness searches give up after settling this many nodes.  A missed witness
+# only costs an unnecessary shortcut, never a wrong answer.
+WITNESS_SETTLE_LIMIT = 500
+
+
+# Dijkstra from source over the remaining graph, skipping the node being
+# contracted.  Stops once every target is settled, past max_dist, or after
+# settle_limit nodes.
+def _witness_search(out_edges, source, skip, targets, max_dist, settle_limit):
+    dist = {source: 0}
+    frontier = [(0, source)]
+    remaining = set(targets)
+    settled = 0
+    while frontier and remaining and settled < settle_limit:
+        d, node = heapq.heappop(frontier)
+        if d > dist[node]:
+            continue
+        if d > max_dist:
+            break
+        settled += 1
+        remaining.discard(node)
+        for neighbor, (weight, _) in out_edges[node].items():
+            if neighbor == skip:
+                continue
+            nd = d + weight
+            if nd < dist.get(neighbor, float("inf")):
+                dist[neighbor] = nd
+                heapq.heappush(frontier, (nd, neighbor))
+    return dist
+
+
+# Shortcuts (u, w, weight) needed to remove node v from the remaining graph
+def _shortcuts_for(out_edges, in_edges, v, settle_limit):
+    shortcuts = []
+    outgoing = list(out_edges[v].items())
+    if not outgoing:
+        return shortcuts
+    max_out = max(weight for _, (weight, _) in outgoing)
+    for u, (in_weight, _) in in_edges[v].items():
+        targets = [w for w, _ in outgoing if w != u]
+        reach = _witness_search(out_edges, u, v, targets, in_weight + max_out, settle_limit)
+        for w, (out_weight, _) in outgoing:
+            if w == u:
+                continue
+            via = in_weight + out_weight
+            if reach.get(w, float("inf")) > via:
+                shortcuts.append((u, w, via))
+    return shortcuts
+
+
+def _add_edge(out_edges, in_edges, u, w, weight, middle):
+    current = out_edges[u].get(w)
+    if current is None or weight < current[0]:
+        out_edges[u][w] = (weight, middle)
+        in_edges[w][u] = (weight, middle)
+
+
+# Contraction hierarchy over a route_engine.Graph.  Every node gets a rank;
+# the search from the start only climbs to higher ranks over `up` edges and
+# the search from the goal only climbs over `down` edges (stored reversed, at
+# their lower endpoint).  Shortcut edges remember the node they bypass in
+# `middle` so paths can be unpacked.
+class ContractionHierarchy:
+    def __init__(self, names, rank, up, down):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.rank = rank
+        # Each side is (offsets, targets, weights, middles) in CSR layout
+        self.up = up
+        self.down = down
+
+    @classmethod
+    def build(cls, graph, settle_limit=WITNESS_SETTLE_LIMIT):
+        """Order and contract every node of graph, inserting shortcuts."""
+        n = len(graph)
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        for u in range(n):
+            for w, weight in graph.neighbors(u):
+                if w != u:
+                    _add_edge(out_edges, in_edges, u, w, weight, NO_PARENT)
+
+        deleted_neighbors = [0] * n
+
+        def priority(v):
+            shortcuts = _shortcuts_for(out_edges, in_edges, v, settle_limit)
+            degree = len(out_edges[v]) + len(in_edges[v])
+            return len(shortcuts) - degree + deleted_neighbors[v]
+
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        rank = array("q", bytes(8 * n))
+        up = [None] * n
+        down = [None] * n
+
+        for next_rank in range(n):
+            # Lazy update: re-evaluate the cheapest node and put it back if
+            # another one has become cheaper
+            while True:
+                _, v = heapq.heappop(queue)
+                current = priority(v)
+                if not queue or current <= queue[0][0]:
+                    break
+                heapq.heappush(queue, (current, v))
+
+            for u, w, weight in _shortcuts_for(out_edges, in_edges, v, settle_limit):
+                _add_edge(out_edges, in_edges, u, w, weight, v)
+            rank[v] = next_rank
+
+            # Whatever v still connects to is contracted later, so these are
+            # exactly its upward and (reversed) downward edges
+            up[v] = [(w, weight, middle) for w, (weight, middle) in out_edges[v].items()]
+            down[v] = [(u, weight, middle) for u, (weight, middle) in in_edges[v].items()]
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                deleted_neighbors[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                deleted_neighbors[u] += 1
+            out_edges[v] = in_edges[v] = None
+
+        return cls(list(graph.names), rank, _to_csr(up), _to_csr(down))
+
+    def save(self, path):
+        """Write the hierarchy to a single binary file."""
+        names = "\n".join(self.names).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.names), len(self.up[1]), len(self.down[1])))
+            f.write(struct.pack("<q", len(names)))
+            f.write(names)
+            self.rank.tofile(f)
+            for side in (self.up, self.down):
+                for column in side:
+                    column.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            magic, n, up_count, down_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a contraction hierarchy file")
+            (names_size,) = struct.unpack("<q", f.read(8))
+            names = f.read(names_size).decode("utf-8").split("\n") if n else []
+            rank = _read_array(f, "q", n)
+            sides = []
+            for count in (up_count, down_count):
+                sides.append((
+                    _read_array(f, "q", n + 1),
+                    _read_array(f, "q", count),
+                    _read_array(f, "d", count),
+                    _read_array(f, "q", count),
+                ))
+        return cls(names, rank, sides[0], sides[1])
+
+    def query(self, start, goal):
+        """Bidirectional upward search; returns the same Route as dijkstra()."""
+        source = self._id(start)
+        target = self._id(goal)
+        searches = [
+            (self.up, {source: 0}, {source: NO_PARENT}, [(0, source)]),
+            (self.down, {target: 0}, {target: NO_PARENT}, [(0, target)]),
+        ]
+        best = float("inf")
+        meeting = None
+        expanded = 0
+
+        while searches[0][3] or searches[1][3]:
+            for side, other in ((0, 1), (1, 0)):
+                (offsets, targets, weights, _), dist, parent, frontier = searches[side]
+                if not frontier:
+                    continue
+                d, node = heapq.heappop(frontier)
+                if d > dist[node]:
+                    continue
+                # Upward searches cannot stop at the first meeting; they stop
+                # once their own frontier is past the best distance
+                if d >= best:
+                    frontier.clear()
+                    continue
+                expanded += 1
+                other_dist = searches[other][1]
+                if node in other_dist and d + other_dist[node] < best:
+                    best = d + other_dist[node]
+                    meeting = node
+                for e in range(offsets[node], offsets[node + 1]):
+                    neighbor = targets[e]
+                    nd = d + weights[e]
+                    if nd < dist.get(neighbor, float("inf")):
+                        dist[neighbor] = nd
+                        parent[neighbor] = (node, e)
+                        heapq.heappush(frontier, (nd, neighbor))
+
+        if meeting is None:
+            return Route(None, float("inf"), expanded)  # No path found
+
+        # Up-edges from the start to the meeting node, then down-edges to the goal
+        forward = []
+        node = meeting
+        while searches[0][2][node] != NO_PARENT:
+            prev, e = searches[0][2][node]
+            forward.append((prev, node, self.up[3][e]))
+            node = prev
+        forward.reverse()
+        backward = []
+        node = meeting
+        while searches[1][2][node] != NO_PARENT:
+            nxt, e = searches[1][2][node]
+            backward.append((node, nxt, self.down[3][e]))
+            node = nxt
+
+        nodes = [source]
+        for u, w, middle in forward + backward:
+            self._unpack(u, w, middle, nodes)
+        return Route([self.names[i] for i in nodes], tidy_distance(best), expanded)
+
+    # Append the original nodes of edge u -> w (excluding u) to nodes
+    def _unpack(self, u, w, middle, nodes):
+        stack = [(u, w, middle)]
+        while stack:
+            u, w, middle = stack.pop()
+            if middle == NO_PARENT:
+                nodes.append(w)
+            else:
+                # Second half is pushed first so the first half is unpacked first
+                stack.append((middle, w, self._middle_of(middle, w)))
+                stack.append((u, middle, self._middle_of(u, middle)))
+
+    # Middle node of the hierarchy edge u -> w
+    def _middle_of(self, u, w):
+        if self.rank[w] > self.rank[u]:
+            offsets, targets, weights, middles = self.up
+            node, other = u, w
+        else:
+            offsets, targets, weights, middles = self.down
+            node, other = w, u
+        found = None
+        for e in range(offsets[node], offsets[node + 1]):
+            if targets[e] == other and (found is None or weights[e] < weights[found]):
+                found = e
+        return middles[found]
+
+    def _id(self, name):
+        try:
+            return self.index[name]
+        except KeyError:
+            raise ValueError(f"Unknown city: {name}") from None
+
+
+def _to_csr(adjacency):
+    offsets = array("q", [0])
+    targets = array("q")
+    weights = array("d")
+    middles = array("q")
+    for edges in adjacency:
+        for target, weight, middle in edges:
+            targets.append(target)
+            weights.append(weight)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return offsets, targets, weights, middles
+
+
+def _read_array(f, typecode, count):
+    column = array(typecode)
+    column.fromfile(f, count)
+    return column
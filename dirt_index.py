@@ -0,0 +1,113 @@
+BUCKET_SIZE = 8
+
+
+# Set of dirty (row, col) cells bucketed into BUCKET_SIZE x BUCKET_SIZE
+# squares.  nearest() searches outward ring by ring of buckets and stops as
+# soon as no unsearched bucket can hold anything closer, so a query touches
+# only the buckets around the vacuum instead of every dirty cell.
+class DirtIndex:
+    def __init__(self, cells=(), bucket_size=BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self.count = 0
+        # Bucket rows and columns ever used; only grows, which is enough to
+        # bound the ring search
+        self.bounds = None
+        for cell in cells:
+            self.add(cell)
+
+    def _bucket(self, row, col):
+        return (row // self.bucket_size, col // self.bucket_size)
+
+    def add(self, cell):
+        row, col = cell
+        key = self._bucket(row, col)
+        if self.bounds is None:
+            self.bounds = [key[0], key[0], key[1], key[1]]
+        else:
+            bounds = self.bounds
+            bounds[0], bounds[1] = min(bounds[0], key[0]), max(bounds[1], key[0])
+            bounds[2], bounds[3] = min(bounds[2], key[1]), max(bounds[3], key[1])
+        bucket = self.buckets.setdefault(key, set())
+        if (row, col) not in bucket:
+            bucket.add((row, col))
+            self.count += 1
+
+    def remove(self, cell):
+        row, col = cell
+        key = self._bucket(row, col)
+        bucket = self.buckets.get(key)
+        if bucket is None or (row, col) not in bucket:
+            raise KeyError(cell)
+        bucket.remove((row, col))
+        self.count -= 1
+        if not bucket:
+            del self.buckets[key]
+
+    def discard(self, cell):
+        if cell in self:
+            self.remove(cell)
+
+    def __contains__(self, cell):
+        row, col = cell
+        bucket = self.buckets.get(self._bucket(row, col))
+        return bucket is not None and (row, col) in bucket
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for bucket in self.buckets.values():
+            yield from bucket
+
+    def nearest(self, row, col):
+        """Closest dirty cell by Manhattan distance (ties: smallest row, col), or None."""
+        if not self.count:
+            return None
+        size = self.bucket_size
+        br, bc = self._bucket(row, col)
+        best = None
+        best_key = None
+        ring = 0
+        # The index is bounded, so stop once the ring has passed every bucket
+        max_ring = self._max_ring(br, bc)
+        while ring <= max_ring:
+            # Any cell in ring r is at least (r - 1) * size + 1 steps away
+            if best is not None and (ring - 1) * size + 1 > best_key[0]:
+                break
+            if 8 * ring > len(self.buckets):
+                # Sparse cells on a big map: the rings are mostly empty
+                # buckets, so checking every occupied bucket is cheaper
+                return self._nearest_of_all(row, col)
+            for key in self._ring(br, bc, ring):
+                bucket = self.buckets.get(key)
+                if not bucket:
+                    continue
+                for cell in bucket:
+                    candidate = (abs(cell[0] - row) + abs(cell[1] - col), cell[0], cell[1])
+                    if best_key is None or candidate < best_key:
+                        best_key = candidate
+                        best = cell
+            ring += 1
+        return best
+
+    def _nearest_of_all(self, row, col):
+        best_key = min((abs(cell[0] - row) + abs(cell[1] - col), cell[0], cell[1])
+                       for bucket in self.buckets.values() for cell in bucket)
+        return (best_key[1], best_key[2])
+
+    def _max_ring(self, br, bc):
+        min_row, max_row, min_col, max_col = self.bounds
+        return max(abs(br - min_row), abs(br - max_row), abs(bc - min_col), abs(bc - max_col))
+
+    @staticmethod
+    def _ring(br, bc, ring):
+        if ring == 0:
+            yield (br, bc)
+            return
+        for c in range(bc - ring, bc + ring + 1):
+            yield (br - ring, c)
+            yield (br + ring, c)
+        for r in range(br - ring + 1, br + ring):
+            yield (r, bc - ring)
+            yield (r, bc + ring)
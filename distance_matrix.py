@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from route_engine import shortest_path_tree
+
+# Graph and destination ids of the current worker process, set once by the
+# pool initializer so they are not shipped with every task
+_worker_graph = None
+_worker_targets = None
+
+
+def _init_worker(graph, targets):
+    global _worker_graph, _worker_targets
+    _worker_graph = graph
+    _worker_targets = targets
+
+
+# One single-source search per origin; returns the matrix rows for a chunk
+def _rows(sources, graph=None, targets=None):
+    graph = graph if graph is not None else _worker_graph
+    targets = targets if targets is not None else _worker_targets
+    rows = np.empty((len(sources), len(targets)))
+    for i, source in enumerate(sources):
+        dist, _ = shortest_path_tree(graph, source, stop_at=targets)
+        rows[i] = [dist[t] for t in targets]
+    return rows
+
+
+def distance_matrix(graph, origins, destinations, workers=None, chunk_size=None):
+    """Return a len(origins) x len(destinations) array of shortest distances.
+
+    Runs one single-source Dijkstra per origin, stopping once every
+    destination is settled.  With workers > 1 the origins are split into
+    chunks over a ProcessPoolExecutor; the graph is handed to each worker
+    once through the pool initializer (and shared copy-on-write where the
+    platform forks).  Unreachable pairs are inf.
+    """
+    sources = [graph.node_id(name) for name in origins]
+    targets = [graph.node_id(name) for name in destinations]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(sources) <= 1:
+        return _rows(sources, graph, targets)
+
+    if chunk_size is None:
+        chunk_size = max(1, len(sources) // (workers * 4))
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph, targets)) as pool:
+        return np.vstack(list(pool.map(_rows, chunks)))
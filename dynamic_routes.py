@@ -0,0 +1,302 @@
+import heapq
+import math
+from array import array
+from collections import OrderedDict
+
+from route_engine import NO_PARENT, Route, tidy_distance
+
+INF = float("inf")
+# Searches kept for route() queries on pairs nobody subscribed to
+QUERY_CACHE = 64
+
+
+# Lifelong Planning A* for one (start, goal) pair.  g is the distance found
+# so far and rhs the one-step lookahead from the predecessors; nodes whose
+# two values disagree are queued.  After an edge change only the nodes whose
+# distance actually changed are re-expanded.  `expanded` counts the nodes
+# expanded by the latest compute().
+class _LPAStar:
+    def __init__(self, router, source, target):
+        self.router = router
+        self.source = source
+        self.target = target
+        self.reset()
+
+    def reset(self):
+        self.g = {}
+        self.rhs = {self.source: 0}
+        self.queued = {}
+        self.frontier = []
+        self.heuristic = self.router.heuristic(self.target)
+        self._push(self.source)
+        self.expanded = 0
+
+    def _key(self, node):
+        best = min(self.g.get(node, INF), self.rhs.get(node, INF))
+        return (best + self.heuristic(node), best)
+
+    def _push(self, node):
+        key = self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.frontier, (key, node))
+
+    def _top_key(self):
+        # Drop heap entries superseded by a later push or removal
+        while self.frontier:
+            key, node = self.frontier[0]
+            if self.queued.get(node) == key:
+                return key
+            heapq.heappop(self.frontier)
+        return (INF, INF)
+
+    def update_node(self, node):
+        router = self.router
+        if node != self.source:
+            g, weights = self.g, router.weights
+            best = INF
+            for e in range(router.pred_offsets[node], router.pred_offsets[node + 1]):
+                candidate = g.get(router.pred_sources[e], INF) + weights[router.pred_edges[e]]
+                if candidate < best:
+                    best = candidate
+            self.rhs[node] = best
+        if self.g.get(node, INF) != self.rhs.get(node, INF):
+            self._push(node)
+        else:
+            self.queued.pop(node, None)
+
+    def compute(self):
+        router = self.router
+        offsets, targets = router.graph.offsets, router.graph.targets
+        goal = self.target
+        self.expanded = 0
+        while (self._top_key() < self._key(goal)
+               or self.rhs.get(goal, INF) != self.g.get(goal, INF)):
+            if not self.queued:
+                break
+            _, node = heapq.heappop(self.frontier)
+            del self.queued[node]
+            self.expanded += 1
+            if self.g.get(node, INF) > self.rhs.get(node, INF):
+                self.g[node] = self.rhs[node]
+            else:
+                self.g[node] = INF
+                self.update_node(node)
+            for e in range(offsets[node], offsets[node + 1]):
+                self.update_node(targets[e])
+
+    def route(self):
+        graph = self.router.graph
+        distance = self.g.get(self.target, INF)
+        if distance == INF:
+            return Route(None, INF, self.expanded)  # No path found
+        path = [self.target]
+        steps = [self._back_steps(self.target, {self.target})]
+        seen = {self.target}
+        while path[-1] != self.source:
+            # Step back along an edge the distance can have come through,
+            # never to a node already on the path: with zero-weight edges
+            # several predecessors tie, some of them round a cycle
+            node = next(steps[-1], NO_PARENT)
+            if node == NO_PARENT:
+                if len(path) == 1:
+                    raise RuntimeError(f"No route back from {graph.names[self.target]}")
+                seen.discard(path.pop())
+                steps.pop()
+                continue
+            seen.add(node)
+            path.append(node)
+            steps.append(self._back_steps(node, seen))
+        path.reverse()
+        return Route([graph.names[i] for i in path], tidy_distance(distance), self.expanded)
+
+    def _back_steps(self, node, seen):
+        # Predecessors p of node, not in seen, with g(p) + w(p, node) == g(node),
+        # lowest g first
+        router, g = self.router, self.g
+        distance = g.get(node, INF)
+        steps = []
+        for e in range(router.pred_offsets[node], router.pred_offsets[node + 1]):
+            pred = router.pred_sources[e]
+            if pred not in seen and g.get(pred, INF) + router.weights[router.pred_edges[e]] <= distance:
+                steps.append((g.get(pred, INF), pred))
+        steps.sort()
+        return (pred for _, pred in steps)
+
+
+# Handle returned by DynamicRouter.subscribe()
+class Subscription:
+    def __init__(self, router, key, callback):
+        self.router = router
+        self.key = key
+        self.callback = callback
+
+    def cancel(self):
+        self.router._unsubscribe(self)
+
+
+# Shortest routes on a graph whose edge weights change over time (live
+# traffic).  Subscribed routes keep their LPA* search state; update_edge()
+# repairs each of them and calls back the subscribers whose route changed.
+class DynamicRouter:
+    def __init__(self, graph, use_heuristic=True):
+        self.graph = graph
+        # Private, writable copy of the weights
+        self.weights = array("d", graph.weights)
+        self.use_heuristic = use_heuristic and graph.has_coordinates()
+        self._scale = None
+        # LPA* only repairs raised weights soundly while every edge costs
+        # something: round a zero-weight cycle the stale distances of the
+        # nodes keep each other up.  So they are counted.
+        self._zero_weights = sum(1 for w in self.weights if w == 0)
+
+        # Predecessor lists: for node v, the edges u -> v as (u, edge number)
+        n = len(graph)
+        counts = [0] * (n + 1)
+        for v in graph.targets:
+            counts[v + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self.pred_offsets = array("q", counts)
+        self.pred_sources = array("q", bytes(8 * len(graph.targets)))
+        self.pred_edges = array("q", bytes(8 * len(graph.targets)))
+        fill = counts[:-1]
+        for u in range(n):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                self.pred_sources[fill[v]] = u
+                self.pred_edges[fill[v]] = e
+                fill[v] += 1
+
+        self._searches = {}
+        self._subscribers = {}
+        self._last_routes = {}
+        # Unsubscribed searches, oldest first, each with the heads of the
+        # edges changed since it last ran
+        self._queries = OrderedDict()
+
+    def heuristic(self, target):
+        if not self.use_heuristic:
+            return lambda node: 0
+        if self._scale is None:
+            self._scale = min((self._edge_ratio(e) for e in range(len(self.weights))), default=0.0)
+        xs, ys = self.graph.xs, self.graph.ys
+        gx, gy = xs[target], ys[target]
+        scale = self._scale
+        return lambda node: scale * math.hypot(xs[node] - gx, ys[node] - gy)
+
+    def _edge_ratio(self, e):
+        u = self._source_of(e)
+        v = self.graph.targets[e]
+        length = math.hypot(self.graph.xs[u] - self.graph.xs[v], self.graph.ys[u] - self.graph.ys[v])
+        return self.weights[e] / length if length > 0 else INF
+
+    def _source_of(self, e):
+        offsets = self.graph.offsets
+        lo, hi = 0, len(self.graph)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if offsets[mid + 1] <= e:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def route(self, start, goal):
+        """Shortest route under the current weights.  Unsubscribed pairs
+        keep their search too (the QUERY_CACHE most recent); edge changes
+        are applied to it the next time the pair is asked for."""
+        key = (self.graph.node_id(start), self.graph.node_id(goal))
+        search = self._searches.get(key)
+        if search is not None:
+            return search.route()
+        if key in self._queries:
+            search, pending = self._queries.pop(key)
+            for node in pending:
+                search.update_node(node)
+        else:
+            search = _LPAStar(self, *key)
+        search.compute()
+        self._queries[key] = (search, set())
+        if len(self._queries) > QUERY_CACHE:
+            self._queries.popitem(last=False)
+        return search.route()
+
+    def subscribe(self, start, goal, callback):
+        """Call callback(route) now and whenever the route from start to goal changes."""
+        key = (self.graph.node_id(start), self.graph.node_id(goal))
+        if key not in self._searches:
+            if key in self._queries:
+                search, pending = self._queries.pop(key)
+                for node in pending:
+                    search.update_node(node)
+            else:
+                search = _LPAStar(self, *key)
+            search.compute()
+            self._searches[key] = search
+            self._subscribers[key] = []
+            self._last_routes[key] = search.route()
+        subscription = Subscription(self, key, callback)
+        self._subscribers[key].append(subscription)
+        callback(self._last_routes[key])
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        subscribers = self._subscribers.get(subscription.key, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        if not subscribers:
+            self._subscribers.pop(subscription.key, None)
+            self._searches.pop(subscription.key, None)
+            self._last_routes.pop(subscription.key, None)
+
+    def update_edge(self, u, v, w, both_directions=False):
+        """Set the weight of road u -> v and repair every subscribed route."""
+        source, target = self.graph.node_id(u), self.graph.node_id(v)
+        # Find every road before writing, so a missing one changes nothing
+        edges = self._edges(source, target)
+        if both_directions:
+            edges += self._edges(target, source)
+        changed = set()
+        raised = False
+        for e in edges:
+            if self.weights[e] != w:
+                raised = raised or w > self.weights[e]
+                self._zero_weights += (w == 0) - (self.weights[e] == 0)
+                self.weights[e] = w
+                changed.add(e)
+        if not changed:
+            return
+
+        restart = raised and self._zero_weights > 0
+        if self.use_heuristic and self._scale is not None:
+            new_scale = min(self._scale, *(self._edge_ratio(e) for e in changed))
+            if new_scale < self._scale:
+                # The heuristic could now overestimate
+                self._scale = new_scale
+                restart = True
+        if restart:
+            for search in self._searches.values():
+                search.reset()
+            for search, pending in self._queries.values():
+                search.reset()
+                pending.clear()
+
+        heads = {self.graph.targets[e] for e in changed}
+        for _, pending in self._queries.values():
+            pending.update(heads)
+        for key, search in self._searches.items():
+            for node in heads:
+                search.update_node(node)
+            search.compute()
+            route = search.route()
+            if route.path != self._last_routes[key].path or route.distance != self._last_routes[key].distance:
+                self._last_routes[key] = route
+                for subscription in list(self._subscribers[key]):
+                    subscription.callback(route)
+
+    def _edges(self, source, target):
+        edges = [e for e in range(self.graph.offsets[source], self.graph.offsets[source + 1])
+                 if self.graph.targets[e] == target]
+        if not edges:
+            raise ValueError(f"No road from {self.graph.names[source]} to {self.graph.names[target]}")
+        return edges
@@ -0,0 +1,244 @@
+from collections import deque
+
+import numpy as np
+
+from grid_state import CLEAN, DIRT, OBSTACLE, GridState
+from tour_planner import plan_tour
+from vacuum_sim import DIRECTIONS, DX, DY, Agent
+
+UNREACHABLE = 1 << 30
+# refresh() rebuilds from scratch once more than this fraction of cells changed
+REBUILD_FRACTION = 1 / 64
+# Improving moves TourAgent's tour planning may make
+TOUR_MOVES = 200
+
+
+# Steps from every cell to the nearest dirt, moving up/down/left/right and
+# never through obstacles (multi-source BFS from all dirty cells).  The
+# field remembers the cell values it was computed for, so changes to the
+# grid can be applied incrementally:
+#   - new dirt or a removed obstacle can only shorten distances, so a BFS
+#     spreads out from that cell while it still improves something;
+#   - cleaned dirt or a new obstacle can only lengthen them: the cells that
+#     lose every shortest route are found level by level, cleared, and
+#     refilled from the unaffected cells around them.
+class DistanceField:
+    def __init__(self, grid):
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        self.adjacent = self._adjacency()
+        self.build()
+
+    def build(self):
+        self.seen = bytearray(self.grid.cells.tobytes())  # cell values the field reflects
+        self.dist = [UNREACHABLE] * len(self.seen)
+        queue = deque(np.flatnonzero(self.grid.cells.reshape(-1) == DIRT).tolist())
+        for i in queue:
+            self.dist[i] = 0
+        self._spread(queue)
+
+    def distance(self, x, y):
+        """Steps from (x, y) to the nearest dirt, or UNREACHABLE."""
+        return self.dist[y * self.width + x]
+
+    def _adjacency(self):
+        # Up/down/left/right neighbours of every cell, obstacles included
+        width, size = self.width, self.width * self.height
+        adjacent = []
+        for i in range(size):
+            x = i % width
+            cells = []
+            if i >= width:
+                cells.append(i - width)
+            if i + width < size:
+                cells.append(i + width)
+            if x > 0:
+                cells.append(i - 1)
+            if x + 1 < width:
+                cells.append(i + 1)
+            adjacent.append(tuple(cells))
+        return adjacent
+
+    def refresh(self):
+        """Bring the field up to date with every cell changed in the grid."""
+        current = self.grid.cells.reshape(-1)
+        changed = np.flatnonzero(np.frombuffer(self.seen, dtype=np.uint8) != current)
+        if len(changed) > REBUILD_FRACTION * len(self.dist):
+            self.build()
+            return
+        for i in changed.tolist():
+            self._apply(i, int(current[i]))
+
+    def update(self, x, y):
+        """Bring the field up to date with one cell of the grid."""
+        i = y * self.width + x
+        self._apply(i, self.grid.flat[i])
+
+    def _apply(self, i, value):
+        old = self.seen[i]
+        if value == old:
+            return
+        self.seen[i] = value
+        dist = self.dist
+        if value == DIRT:
+            dist[i] = 0
+            self._spread(deque([i]))
+        elif value == OBSTACLE or old == DIRT:
+            self._raise(i)
+        elif value == CLEAN and old == OBSTACLE:
+            dist[i] = min(UNREACHABLE, min((dist[j] for j in self.adjacent[i]), default=UNREACHABLE) + 1)
+            if dist[i] < UNREACHABLE:
+                self._spread(deque([i]))
+
+    def _spread(self, queue):
+        # Label-correcting BFS: distances only ever decrease
+        dist = self.dist
+        seen = self.seen
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j in self.adjacent[i]:
+                if d < dist[j] and seen[j] != OBSTACLE:
+                    dist[j] = d
+                    queue.append(j)
+
+    def _raise(self, start):
+        dist = self.dist
+        seen = self.seen
+        if dist[start] >= UNREACHABLE:
+            return
+        # Cells whose every shortest route went through start.  Levels are
+        # visited in order, so when a cell is checked every cell one step
+        # closer to the dirt has already been marked or not.
+        adjacent = self.adjacent
+        lost = {start}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            level = dist[i]
+            for j in adjacent[i]:
+                if dist[j] != level + 1 or j in lost:
+                    continue
+                for k in adjacent[j]:
+                    if dist[k] == level and k not in lost:
+                        break
+                else:
+                    lost.add(j)
+                    queue.append(j)
+        for i in lost:
+            dist[i] = UNREACHABLE
+
+        # Refill from the cells that kept their distance
+        seeds = []
+        for i in lost:
+            if seen[i] == OBSTACLE:
+                continue
+            best = UNREACHABLE
+            for j in adjacent[i]:
+                if dist[j] < best:
+                    best = dist[j]
+            if best < UNREACHABLE:
+                dist[i] = best + 1
+                seeds.append(i)
+        seeds.sort(key=dist.__getitem__)
+        self._spread(deque(seeds))
+
+
+# Agent that walks down the distance field to the nearest dirt instead of
+# picking random directions.  Moves go through Agent.move, so energy is
+# counted exactly as for the random walk.
+class PlanningAgent(Agent):
+    def __init__(self, env, incremental=True):
+        super().__init__(env)
+        self.field = DistanceField(env.grid)
+        self.incremental = incremental  # off: rebuild the field after every change
+        self.steps = 0
+
+    @property
+    def done(self):
+        """True when no dirt is reachable from the agent's cell."""
+        return not self.can_reach_dirt()
+
+    def can_reach_dirt(self):
+        # The agent may start on an obstacle, whose distance is unreachable
+        # even though it can step off it
+        return self.field.distance(self.x, self.y) < UNREACHABLE or self.next_direction() is not None
+
+    def check_for_dirt(self):
+        cleaned = self.cleaned_dirt
+        super().check_for_dirt()
+        if self.cleaned_dirt != cleaned:
+            if self.incremental:
+                self.field.update(self.x, self.y)
+            else:
+                self.field.build()
+
+    def next_direction(self):
+        """Direction towards the nearest dirt, or None if there is none to reach."""
+        field = self.field
+        here = field.distance(self.x, self.y)
+        best, best_distance = None, here
+        for d in range(len(DIRECTIONS)):
+            x, y = self.x + DX[d], self.y + DY[d]
+            if 0 <= x < self.env.width and 0 <= y < self.env.height and field.distance(x, y) < best_distance:
+                best, best_distance = d, field.distance(x, y)
+        return DIRECTIONS[best] if best is not None else None
+
+    def step(self, n=1):
+        """Advance up to n steps, stopping early when no dirt is reachable."""
+        # Pick up changes made behind the agent's back, such as randomizing
+        if self.incremental:
+            self.field.refresh()
+        else:
+            self.field.build()
+        for _ in range(n):
+            if self.field.distance(self.x, self.y) == 0:
+                # Dirt under the starting cell
+                self.check_for_dirt()
+                continue
+            direction = self.next_direction()
+            if direction is None:
+                break
+            self.move(direction)
+            self.steps += 1
+
+
+# Agent that visits the dirt in the order of a planned tour (tour_planner,
+# which measures Manhattan distance) and walks an obstacle-aware shortest
+# route to each cell.  Its field is built over a private grid in which only
+# the current target is marked as dirt; with a single source every distance
+# changes between targets, so the field is rebuilt rather than updated.
+# Dirt passed on the way is still cleaned.  The tour is improved for a fixed
+# number of moves rather than a time budget, so the same room always gives
+# the same run.
+class TourAgent(PlanningAgent):
+    def __init__(self, env, max_moves=TOUR_MOVES):
+        Agent.__init__(self, env)
+        self.incremental = True
+        self.steps = 0
+        self.targets = GridState(env.width, env.height)
+        self.targets.cells[env.grid.cells == OBSTACLE] = OBSTACLE
+        self.field = DistanceField(self.targets)
+        self.tour = plan_tour((self.y, self.x), env.grid.dirty_cells(), max_moves=max_moves)
+        self.tour_index = 0
+        self.next_target()
+
+    def next_target(self):
+        """Mark the next tour cell that is still dirty and reachable."""
+        while self.tour_index < len(self.tour):
+            row, col = self.tour[self.tour_index]
+            if self.env.is_dirt(col, row):
+                self.targets.set(col, row, DIRT)
+                self.field.build()
+                if self.can_reach_dirt():
+                    return
+                self.targets.clean(col, row)
+            self.tour_index += 1
+        self.field.build()
+
+    def check_for_dirt(self):
+        Agent.check_for_dirt(self)
+        if self.targets.is_dirt(self.x, self.y):
+            self.targets.clean(self.x, self.y)
+            self.next_target()
@@ -0,0 +1,348 @@
+import argparse
+import random
+import time
+
+from ttt_board import Board
+from ttt_engine import EMPTY, PLAYERS
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+WIN = 1000000
+# A k-cell window holding n > 0 stones of one player and none of the other
+# scores WEIGHT_BASE ** (n - 1) for that player
+WEIGHT_BASE = 8
+RADIUS = 2          # candidate moves are empty cells this close to a stone
+MAX_CANDIDATES = 12  # moves searched at each node, best-ordered first
+CLOCK_NODES = 128    # nodes searched between looks at the clock
+TT_BITS = 18
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def neighbourhoods(rows, cols, radius=RADIUS):
+    """For each cell, the other cells at most radius rows and columns away."""
+    return [
+        [rr * cols + cc for rr in range(max(0, r - radius), min(rows, r + radius + 1))
+         for cc in range(max(0, c - radius), min(cols, c + radius + 1)) if (rr, cc) != (r, c)]
+        for r in range(rows) for c in range(cols)]
+
+
+def completes_line(cells, rows, cols, k, i):
+    """True if the stone at cell i is part of k in a row."""
+    stone = cells[i]
+    r, c = divmod(i, cols)
+    for dr, dc in DIRECTIONS:
+        run = 1
+        for sign in (1, -1):
+            rr, cc = r + sign * dr, c + sign * dc
+            while 0 <= rr < rows and 0 <= cc < cols and cells[rr * cols + cc] == stone:
+                run += 1
+                rr += sign * dr
+                cc += sign * dc
+        if run >= k:
+            return True
+    return False
+
+
+# m x n board where k in a row wins.  Cells are numbered row-major and hold
+# 0 (empty), 1 (X) or 2 (O).  Besides the stones it keeps, incrementally:
+#   - a Zobrist hash of the position and side to move;
+#   - stone counts for every k-cell window and the resulting evaluation;
+#   - how many stones lie within RADIUS of each cell, for move generation.
+# Only lines through the last move are checked for a win.
+class GomokuBoard:
+    def __init__(self, rows=15, cols=15, k=5, seed=0):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        size = rows * cols
+        rng = random.Random(seed)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(size)] for _ in range(2)]
+        self.side_key = rng.getrandbits(64)
+        # Every run of k cells in a straight line, and the runs through each cell
+        self.windows = []
+        self.cell_windows = [[] for _ in range(size)]
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in DIRECTIONS:
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        cells = [(r + dr * j) * cols + c + dc * j for j in range(k)]
+                        for cell in cells:
+                            self.cell_windows[cell].append(len(self.windows))
+                        self.windows.append(cells)
+        self.weights = [0] + [WEIGHT_BASE ** n for n in range(k + 1)]
+        self.neighbourhood = neighbourhoods(rows, cols)
+        self.reset()
+
+    def reset(self):
+        size = self.rows * self.cols
+        self.cells = [0] * size
+        self.turn = 0
+        self.history = []
+        self.hash = 0
+        self.counts = [[0, 0] for _ in self.windows]
+        self.score = 0  # evaluation from X's point of view
+        self.near = [0] * size
+
+    @property
+    def player(self):
+        return PLAYERS[self.turn]
+
+    def _window_value(self, counts):
+        x, o = counts
+        if x and o:
+            return 0
+        return self.weights[x] - self.weights[o]
+
+    def is_free(self, i):
+        return not self.cells[i]
+
+    def legal_moves(self):
+        return [i for i, cell in enumerate(self.cells) if not cell]
+
+    def make(self, i):
+        turn = self.turn
+        self.cells[i] = turn + 1
+        self.hash ^= self.zobrist[turn][i] ^ self.side_key
+        for w in self.cell_windows[i]:
+            counts = self.counts[w]
+            before = self._window_value(counts)
+            counts[turn] += 1
+            self.score += self._window_value(counts) - before
+        for j in self.neighbourhood[i]:
+            self.near[j] += 1
+        self.history.append(i)
+        self.turn = 1 - turn
+
+    def unmake(self):
+        i = self.history.pop()
+        turn = 1 - self.turn
+        self.cells[i] = 0
+        self.hash ^= self.zobrist[turn][i] ^ self.side_key
+        for w in self.cell_windows[i]:
+            counts = self.counts[w]
+            before = self._window_value(counts)
+            counts[turn] -= 1
+            self.score += self._window_value(counts) - before
+        for j in self.neighbourhood[i]:
+            self.near[j] -= 1
+        self.turn = turn
+
+    def winner(self):
+        """'X' or 'O' if the last move completed k in a row, else None."""
+        if not self.history:
+            return None
+        i = self.history[-1]
+        if completes_line(self.cells, self.rows, self.cols, self.k, i):
+            return PLAYERS[self.cells[i] - 1]
+        return None
+
+    def is_full(self):
+        return len(self.history) == len(self.cells)
+
+    def is_over(self):
+        return self.winner() is not None or self.is_full()
+
+    def cell(self, i):
+        return PLAYERS[self.cells[i] - 1] if self.cells[i] else EMPTY
+
+    def candidates(self):
+        """Empty cells near a stone (the centre on an empty board)."""
+        if not self.history:
+            return [(self.rows // 2) * self.cols + self.cols // 2]
+        near, cells = self.near, self.cells
+        return [i for i in range(len(cells)) if near[i] and not cells[i]]
+
+    def priority(self, i):
+        """How much a stone at i matters to either side, for move ordering."""
+        total, weights = 0, self.weights
+        for w in self.cell_windows[i]:
+            x, o = self.counts[w]
+            if not o:
+                total += weights[x + 1]
+            if not x:
+                total += weights[o + 1]
+        return total
+
+
+# Fixed-size transposition table of two-slot buckets: the first slot keeps
+# the deepest search seen for its bucket (unless it is from an older move),
+# the second always takes the newest entry.
+class TranspositionTable:
+    def __init__(self, bits=TT_BITS):
+        self.mask = (1 << bits) - 1
+        self.slots = [None] * (2 << bits)
+        self.age = 0
+
+    def get(self, key):
+        base = (key & self.mask) << 1
+        for entry in (self.slots[base], self.slots[base + 1]):
+            if entry is not None and entry[0] == key:
+                return entry
+        return None
+
+    def put(self, key, depth, flag, value, move):
+        base = (key & self.mask) << 1
+        entry = (key, depth, flag, value, move, self.age)
+        deep = self.slots[base]
+        if deep is None or deep[0] == key or depth >= deep[1] or deep[5] != self.age:
+            self.slots[base] = entry
+        else:
+            self.slots[base + 1] = entry
+
+
+# Iterative-deepening alpha-beta (negamax) player for GomokuBoard.  Each
+# completed depth's best move is kept, so running out of time_budget
+# seconds mid-depth still returns a sound move.
+class SearchPlayer:
+    def __init__(self, time_budget=0.5, max_depth=20, tt_bits=TT_BITS):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = TranspositionTable(tt_bits)
+        self.nodes = 0
+        self.depth = 0
+
+    def choose_move(self, board):
+        """(row, col) of the chosen move for the side to move."""
+        return divmod(self.search(board), board.cols)
+
+    def search(self, board):
+        self.deadline = time.perf_counter() + self.time_budget
+        self.nodes = 0
+        self.depth = 0
+        self.table.age += 1
+        moves = self._ordered(board, board.candidates(), None)
+        best = moves[0]
+        # Take an immediate win, or block the opponent's, without searching
+        for urgent in (board.turn, 1 - board.turn):
+            for i in moves:
+                if self._completes(board, i, urgent):
+                    return i
+        moves = moves[:MAX_CANDIDATES]
+        played = len(board.history)
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value, move = self._root(board, moves, depth)
+            except SearchTimeout:
+                # Take back the moves the aborted search left on the board
+                while len(board.history) > played:
+                    board.unmake()
+                break
+            best = move
+            self.depth = depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) >= WIN - 1000 or depth >= len(board.cells) - len(board.history):
+                break  # a forced result, or the whole game has been searched
+        return best
+
+    def _completes(self, board, i, turn):
+        # Would a stone of turn at i make k in a row?
+        for w in board.cell_windows[i]:
+            if board.counts[w][turn] == board.k - 1 and not board.counts[w][1 - turn]:
+                return True
+        return False
+
+    def _ordered(self, board, moves, first):
+        moves = sorted(moves, key=board.priority, reverse=True)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _root(self, board, moves, depth):
+        alpha, beta = -WIN - 1, WIN + 1
+        best_move, best = moves[0], -WIN - 1
+        for i in moves:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout
+            board.make(i)
+            value = -self._negamax(board, depth - 1, -beta, -alpha, 1)
+            board.unmake()
+            if value > best:
+                best, best_move = value, i
+            alpha = max(alpha, value)
+        return best, best_move
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes % CLOCK_NODES and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        if board.winner():
+            return -WIN + ply  # the side to move has lost
+        if board.is_full():
+            return 0
+        if depth == 0:
+            return board.score if board.turn == 0 else -board.score
+
+        entry = self.table.get(board.hash)
+        first = None
+        if entry is not None:
+            _, stored_depth, flag, value, first, _ = entry
+            if stored_depth >= depth:
+                # Mate scores are stored relative to the node, not the root
+                if value > WIN - 1000:
+                    value -= ply
+                elif value < -WIN + 1000:
+                    value += ply
+                if flag == 0 or (flag < 0 and value <= alpha) or (flag > 0 and value >= beta):
+                    return value
+
+        original_alpha = alpha
+        best, best_move = -WIN - 1, None
+        for i in self._ordered(board, board.candidates(), first)[:MAX_CANDIDATES]:
+            board.make(i)
+            value = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake()
+            if value > best:
+                best, best_move = value, i
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        flag = -1 if best <= original_alpha else 1 if best >= beta else 0
+        stored = best
+        if stored > WIN - 1000:
+            stored += ply
+        elif stored < -WIN + 1000:
+            stored -= ply
+        self.table.put(board.hash, depth, flag, stored, best_move)
+        return best
+
+
+def new_board(rows, cols, k):
+    """The bitboard for classic 3x3 Tic-Tac-Toe, a GomokuBoard otherwise."""
+    return Board() if (rows, cols, k) == (3, 3, 3) else GomokuBoard(rows, cols, k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Let the search player play itself on an m x n board")
+    parser.add_argument("--rows", type=int, default=15)
+    parser.add_argument("--cols", type=int, default=15)
+    parser.add_argument("-k", type=int, default=5, help="stones in a row to win")
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds per move")
+    parser.add_argument("--moves", type=int, default=20)
+    args = parser.parse_args()
+
+    board = GomokuBoard(args.rows, args.cols, args.k)
+    player = SearchPlayer(args.budget)
+    for _ in range(args.moves):
+        started = time.perf_counter()
+        row, col = player.choose_move(board)
+        elapsed = time.perf_counter() - started
+        mover = board.player
+        board.make(row * board.cols + col)
+        print(f"{mover} at ({row + 1}, {col + 1})  depth {player.depth}  {player.nodes} nodes  "
+              f"{elapsed:.2f} s  ({player.nodes / max(elapsed, 1e-9):,.0f} nodes/s)")
+        if board.is_over():
+            print(f"{board.winner() or 'nobody'} wins")
+            break
+    for r in range(board.rows):
+        print(" ".join(board.cell(r * board.cols + c) for c in range(board.cols)))
+
+
+if __name__ == "__main__":
+    main()
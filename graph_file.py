@@ -0,0 +1,249 @@
+import argparse
+import bisect
+import csv
+import mmap
+import struct
+from array import array
+
+from route_engine import Graph
+
+# File layout (little-endian, every section padded to 8 bytes):
+#   header
+#   offsets       int64[n + 1]   CSR row starts
+#   targets       int32[m]
+#   weights       float64[m]
+#   rev_offsets   int64[n + 1]   the same graph with every edge flipped,
+#   rev_targets   int32[m]       used by bidirectional search
+#   rev_weights   float64[m]
+#   xs, ys        float64[n]     only if FLAG_COORDS is set
+#   name_offsets  int64[n + 1]   start of each name in the names block
+#   name_order    int32[n]       node numbers sorted by name, for lookups
+#   names         utf-8 bytes
+MAGIC = b"RGRAPH01"
+HEADER = struct.Struct("<8sqqqqd")  # magic, nodes, edges, flags, names size, heuristic scale
+FLAG_COORDS = 1
+
+
+def _pad(size):
+    return (size + 7) & ~7
+
+
+# Node names read straight from the mapped file, decoded on access
+class MappedNames:
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("node number out of range")
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+# Name -> node number lookup by binary search over the sorted name order, so
+# opening a file does not have to build a dict of every name
+class MappedIndex:
+    def __init__(self, names, order):
+        self._names = names
+        self._order = order
+        self._keys = _SortedNames(names, order)
+
+    def __getitem__(self, name):
+        i = bisect.bisect_left(self._keys, name)
+        if i < len(self._order) and self._keys[i] == name:
+            return self._order[i]
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
+class _SortedNames:
+    def __init__(self, names, order):
+        self._names = names
+        self._order = order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, i):
+        return self._names[self._order[i]]
+
+
+# A Graph whose arrays are views into a memory-mapped file.  Pickling sends
+# only the path, so worker processes map the same file and share its pages.
+class MappedGraph(Graph):
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, n, m, flags, names_size, scale = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a road graph file")
+
+        position = _pad(HEADER.size)
+
+        def take(typecode, count):
+            nonlocal position
+            size = count * struct.calcsize(typecode)
+            section = view[position:position + size].cast(typecode)
+            position += _pad(size)
+            return section
+
+        offsets, targets, weights = take("q", n + 1), take("i", m), take("d", m)
+        reverse = (take("q", n + 1), take("i", m), take("d", m))
+        xs = ys = None
+        if flags & FLAG_COORDS:
+            xs, ys = take("d", n), take("d", n)
+        name_offsets = take("q", n + 1)
+        name_order = take("i", n)
+        names = MappedNames(name_offsets, view[position:position + names_size])
+
+        super().__init__(names, offsets, targets, weights, xs, ys, MappedIndex(names, name_order))
+        self._heuristic_scale = scale
+        rev = Graph(names, *reverse, xs, ys, self._index)
+        rev._reverse = self
+        rev._heuristic_scale = scale
+        self._reverse = rev
+
+    def __reduce__(self):
+        return (MappedGraph, (self.path,))
+
+
+def load_graph(path):
+    """Memory-map a graph written by save_graph() or convert()."""
+    return MappedGraph(path)
+
+
+def save_graph(graph, path):
+    """Write any route_engine.Graph in the binary format."""
+    names = list(graph.names)
+    n = len(names)
+    encoded = [name.encode("utf-8") for name in names]
+    name_offsets = array("q", [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+    name_order = array("i", sorted(range(n), key=names.__getitem__))
+    blob = b"".join(encoded)
+    reverse = graph.reverse()
+    has_coords = graph.has_coordinates()
+    scale = graph.heuristic_scale() if has_coords else 0.0
+
+    sections = [
+        array("q", graph.offsets), array("i", graph.targets), array("d", graph.weights),
+        array("q", reverse.offsets), array("i", reverse.targets), array("d", reverse.weights),
+    ]
+    if has_coords:
+        sections += [array("d", graph.xs), array("d", graph.ys)]
+    sections += [name_offsets, name_order]
+
+    with open(path, "wb") as f:
+        _write_padded(f, HEADER.pack(MAGIC, n, len(graph.targets), FLAG_COORDS if has_coords else 0, len(blob), scale))
+        for section in sections:
+            _write_padded(f, section.tobytes())
+        f.write(blob)
+
+
+def _write_padded(f, data):
+    f.write(data)
+    f.write(bytes(_pad(len(data)) - len(data)))
+
+
+def _read_rows(path):
+    with open(path, newline="") as f:
+        sample = f.readline()
+        f.seek(0)
+        if "," in sample:
+            rows = csv.reader(f)
+        else:
+            rows = (line.split() for line in f)
+        for row in rows:
+            if not row or row[0].startswith("#"):
+                continue
+            yield row
+
+
+def convert(edges_path, out_path, nodes_path=None, undirected=False):
+    """Convert a CSV (source,target,weight) or whitespace edge list to a graph file.
+
+    An optional nodes file lists name,x,y for the A* heuristic.  A header
+    row is skipped if its weight column is not a number.
+    """
+    index = {}
+    names = []
+    coords = None
+    if nodes_path:
+        coords = []
+        for row in _read_rows(nodes_path):
+            try:
+                x, y = float(row[1]), float(row[2])
+            except ValueError:
+                continue  # Header
+            index[row[0]] = len(names)
+            names.append(row[0])
+            coords.append((x, y))
+
+    def node(name):
+        i = index.get(name)
+        if i is None:
+            if coords is not None:
+                raise ValueError(f"{name} is missing from {nodes_path}")
+            i = index[name] = len(names)
+            names.append(name)
+        return i
+
+    sources, targets, weights = array("q"), array("q"), array("d")
+    for row in _read_rows(edges_path):
+        try:
+            weight = float(row[2])
+        except ValueError:
+            continue  # Header
+        u, v = node(row[0]), node(row[1])
+        sources.append(u)
+        targets.append(v)
+        weights.append(weight)
+        if undirected:
+            sources.append(v)
+            targets.append(u)
+            weights.append(weight)
+
+    graph = Graph.from_arrays(names, sources, targets, weights, coords)
+    save_graph(graph, out_path)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an edge list to a memory-mappable road graph file")
+    parser.add_argument("edges", help="CSV or whitespace-separated file of source, target, weight")
+    parser.add_argument("output")
+    parser.add_argument("--nodes", help="CSV of name, x, y coordinates")
+    parser.add_argument("--undirected", action="store_true", help="add the reverse of every edge")
+    args = parser.parse_args()
+    graph = convert(args.edges, args.output, args.nodes, args.undirected)
+    print(f"Wrote {len(graph)} nodes and {graph.edge_count()} edges to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
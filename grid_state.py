@@ -0,0 +1,75 @@
+import numpy as np
+
+# Cell values, as in the original Environment.grid
+CLEAN = 0
+DIRT = 1
+OBSTACLE = 2
+
+
+# Room grid shared by both vacuum simulators: one uint8 per cell in a NumPy
+# array, cells[y, x].  Single-cell queries go through a flat memoryview of
+# the same buffer, which is much cheaper than NumPy scalar indexing.
+class GridState:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = np.zeros((height, width), dtype=np.uint8)
+        self.flat = memoryview(self.cells.reshape(-1))
+
+    def __getitem__(self, y):
+        # Row access, so grid[y][x] keeps working
+        return self.cells[y]
+
+    def get(self, x, y):
+        return self.flat[y * self.width + x]
+
+    def set(self, x, y, value):
+        self.flat[y * self.width + x] = value
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_dirt(self, x, y):
+        return self.flat[y * self.width + x] == DIRT
+
+    def is_obstacle(self, x, y):
+        return self.flat[y * self.width + x] == OBSTACLE
+
+    def clean(self, x, y):
+        self.flat[y * self.width + x] = CLEAN
+
+    def randomize(self, dirt_count, obstacle_count, rng=None, distinct=False):
+        """Scatter dirt, then obstacles on cells that are still clean.
+
+        Positions are drawn with replacement like the original randint
+        loops, unless distinct is set, in which case exactly dirt_count
+        different cells are dirtied.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        size = self.width * self.height
+        cells = self.cells.reshape(-1)
+        if distinct:
+            dirt = rng.choice(size, size=min(dirt_count, size), replace=False)
+        else:
+            dirt = rng.integers(0, size, dirt_count)
+        cells[dirt] = DIRT
+        obstacles = rng.integers(0, size, obstacle_count)
+        obstacles = obstacles[cells[obstacles] == CLEAN]
+        cells[obstacles] = OBSTACLE
+
+    def dirty_cells(self):
+        """List of (row, col) for every dirty cell."""
+        return [tuple(cell) for cell in np.argwhere(self.cells == DIRT).tolist()]
+
+    def dirt_count(self):
+        return int(np.count_nonzero(self.cells == DIRT))
+
+    def window(self, x, y, width, height):
+        """Copy of the cells in a rectangle, indexed [y, x], for viewers."""
+        return self.cells[y:y + height, x:x + width].copy()
+
+    def copy(self):
+        other = GridState(self.width, self.height)
+        other.cells[...] = self.cells
+        return other
@@ -0,0 +1,108 @@
+import heapq
+
+from route_engine import NO_PARENT, Route, shortest_path_tree, tidy_distance
+
+INF = float("inf")
+
+
+# Weight of the cheapest edge u -> v
+def _edge_weight(graph, u, v):
+    best = INF
+    for e in range(graph.offsets[u], graph.offsets[u + 1]):
+        if graph.targets[e] == v and graph.weights[e] < best:
+            best = graph.weights[e]
+    return best
+
+
+# Shortest path from spur to target that avoids blocked nodes and edges.
+# to_goal/next_hop form the shortest-path tree towards the target on the
+# full graph, computed once per query.  If the tree path from spur is still
+# open it is the answer without any search; otherwise A* runs with to_goal
+# as the heuristic, which stays exact-or-lower because blocking only makes
+# distances longer.
+def _spur_path(graph, spur, target, to_goal, next_hop, blocked_nodes, blocked_edges):
+    path = [spur]
+    node = spur
+    while node != target and node != NO_PARENT:
+        step = next_hop[node]
+        if step in blocked_nodes or (node, step) in blocked_edges:
+            break
+        path.append(step)
+        node = step
+    else:
+        if node == target:
+            return path, to_goal[spur], 0
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    dist = {spur: 0}
+    parent = {spur: NO_PARENT}
+    settled = set()
+    frontier = [(to_goal[spur], 0, spur)]
+    expanded = 0
+    while frontier:
+        _, d, node = heapq.heappop(frontier)
+        if node in settled:
+            continue
+        settled.add(node)
+        expanded += 1
+        if node == target:
+            path = []
+            while node != NO_PARENT:
+                path.append(node)
+                node = parent[node]
+            path.reverse()
+            return path, d, expanded
+        for e in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[e]
+            if neighbor in blocked_nodes or (node, neighbor) in blocked_edges:
+                continue
+            nd = d + weights[e]
+            if nd < dist.get(neighbor, INF) and to_goal[neighbor] < INF:
+                dist[neighbor] = nd
+                parent[neighbor] = node
+                heapq.heappush(frontier, (nd + to_goal[neighbor], nd, neighbor))
+    return None, INF, expanded
+
+
+def k_shortest_paths(graph, start, goal, k=3):
+    """Yen's algorithm: up to k loopless routes from start to goal, shortest first.
+
+    Each Route's expanded field is the number of nodes the spur search that
+    found it settled (0 when the precomputed tree already gave the answer).
+    """
+    source = graph.node_id(start)
+    target = graph.node_id(goal)
+    # Shortest-path tree into the goal: distances and next hop for every node
+    to_goal, next_hop = shortest_path_tree(graph.reverse(), target)
+    if to_goal[source] == INF:
+        return []
+
+    first, _, _ = _spur_path(graph, source, target, to_goal, next_hop, set(), set())
+    found = [(to_goal[source], first, 0)]
+    seen = {tuple(first)}
+    candidates = []
+
+    while len(found) < k:
+        _, previous, _ = found[-1]
+        root_cost = 0
+        for i in range(len(previous) - 1):
+            spur = previous[i]
+            root = previous[:i + 1]
+            blocked_edges = {(path[i], path[i + 1]) for _, path, _ in found
+                             if len(path) > i + 1 and path[:i + 1] == root}
+            blocked_nodes = set(root[:-1])
+            spur_path, spur_cost, expanded = _spur_path(
+                graph, spur, target, to_goal, next_hop, blocked_nodes, blocked_edges)
+            if spur_path is not None:
+                path = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (root_cost + spur_cost, len(path), path, expanded))
+            root_cost += _edge_weight(graph, previous[i], previous[i + 1])
+        if not candidates:
+            break
+        cost, _, path, expanded = heapq.heappop(candidates)
+        found.append((cost, path, expanded))
+
+    return [Route([graph.names[i] for i in path], tidy_distance(cost), expanded)
+            for cost, path, expanded in found]
@@ -0,0 +1,282 @@
+import math
+
+# Zoom levels below which the renderer drops detail
+LABEL_ZOOM = 0.5       # city names
+NODE_ZOOM = 0.2        # city dots
+MIN_EDGE_PIXELS = 2    # roads shorter than this on screen are skipped
+DETAIL_CELLS = 2500    # above this many visible grid cells, draw a density overview
+
+
+# Uniform grid over the map.  Each bucket holds the nodes inside it and the
+# edges whose bounding box overlaps it, so a viewport query only touches the
+# buckets it covers.
+class GridIndex:
+    def __init__(self, graph, cell_size=None):
+        xs, ys = graph.xs, graph.ys
+        n = len(graph)
+        self.min_x, self.max_x = min(xs), max(xs)
+        self.min_y, self.max_y = min(ys), max(ys)
+        if cell_size is None:
+            # Aim for a few nodes per bucket
+            area = max(self.max_x - self.min_x, 1) * max(self.max_y - self.min_y, 1)
+            cell_size = max(math.sqrt(area / max(n / 4, 1)), 1e-9)
+        self.cell_size = cell_size
+        self.nodes = {}
+        self.edges = {}
+
+        for node in range(n):
+            self.nodes.setdefault(self._cell(xs[node], ys[node]), []).append(node)
+
+        # Each road is drawn once even if both directions are in the graph
+        self.edge_list = []
+        seen = set()
+        for u in range(n):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                pair = (u, v) if u < v else (v, u)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                edge_id = len(self.edge_list)
+                self.edge_list.append(pair)
+                cx0, cy0 = self._cell(min(xs[u], xs[v]), min(ys[u], ys[v]))
+                cx1, cy1 = self._cell(max(xs[u], xs[v]), max(ys[u], ys[v]))
+                for cx in range(cx0, cx1 + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        self.edges.setdefault((cx, cy), []).append(edge_id)
+
+        # Node counts per cell at coarser and coarser levels (cells merged
+        # 2x2 per level), for the zoomed-out overview
+        self.levels = [{cell: len(nodes) for cell, nodes in self.nodes.items()}]
+        while len(self.levels[-1]) > 1:
+            coarser = {}
+            for (cx, cy), count in self.levels[-1].items():
+                key = (cx >> 1, cy >> 1)
+                coarser[key] = coarser.get(key, 0) + count
+            self.levels.append(coarser)
+
+    def _cell(self, x, y):
+        return (int((x - self.min_x) // self.cell_size), int((y - self.min_y) // self.cell_size))
+
+    def _cell_range(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        # Clamp to the occupied grid so a far zoom-out does not loop over empty cells
+        last_x, last_y = self._cell(self.max_x, self.max_y)
+        return max(cx0, 0), max(cy0, 0), min(cx1, last_x), min(cy1, last_y)
+
+    def cell_count(self, x0, y0, x1, y1):
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        return max(cx1 - cx0 + 1, 0) * max(cy1 - cy0 + 1, 0)
+
+    def density(self, x0, y0, x1, y1, max_cells):
+        """Return (x0, y0, x1, y1, node count) blocks covering the rectangle.
+
+        Uses the finest level at which no more than max_cells blocks are
+        visible, so the cost does not depend on the size of the map.
+        """
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        level = 0
+        while (level + 1 < len(self.levels)
+               and ((cx1 >> level) - (cx0 >> level) + 1) * ((cy1 >> level) - (cy0 >> level) + 1) > max_cells):
+            level += 1
+        counts = self.levels[level]
+        size = self.cell_size * (1 << level)
+        blocks = []
+        for bx in range(cx0 >> level, (cx1 >> level) + 1):
+            for by in range(cy0 >> level, (cy1 >> level) + 1):
+                count = counts.get((bx, by))
+                if count:
+                    wx, wy = self.min_x + bx * size, self.min_y + by * size
+                    blocks.append((wx, wy, wx + size, wy + size, count))
+        return blocks
+
+    def query(self, x0, y0, x1, y1):
+        """Return (nodes, edge ids) that may be visible in the world rectangle."""
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        nodes = []
+        edges = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                nodes.extend(self.nodes.get((cx, cy), ()))
+                edges.update(self.edges.get((cx, cy), ()))
+        return nodes, edges
+
+
+# Draws a route_engine.Graph with coordinates onto a Tk canvas.  Only what
+# lies in the current viewport is drawn, detail is dropped when zoomed out,
+# and routes are animated with after() so the event loop never blocks.
+class MapRenderer:
+    def __init__(self, canvas, graph, node_radius=10, font=("Arial", 10)):
+        self.canvas = canvas
+        self.graph = graph
+        self.index = GridIndex(graph)
+        self.node_radius = node_radius
+        self.font = font
+        # World coordinate shown at the top-left corner, and pixels per unit
+        self.origin_x = 0.0
+        self.origin_y = 0.0
+        self.zoom = 1.0
+        self.highlighted_nodes = set()
+        self.highlighted_edges = set()
+        self._redraw_pending = False
+        self._animation = None
+        self._on_done = None  # callback of the running animation
+        self._drag_start = None
+        self.items_drawn = 0
+
+        canvas.bind("<Configure>", lambda event: self.schedule_redraw())
+        canvas.bind("<ButtonPress-1>", self._on_press)
+        canvas.bind("<B1-Motion>", self._on_drag)
+        canvas.bind("<MouseWheel>", self._on_wheel)
+        canvas.bind("<Button-4>", lambda event: self.zoom_at(event.x, event.y, 1.25))
+        canvas.bind("<Button-5>", lambda event: self.zoom_at(event.x, event.y, 0.8))
+
+    def _size(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        # Before the window is mapped the canvas reports 1x1
+        if width <= 1:
+            width = int(self.canvas["width"])
+        if height <= 1:
+            height = int(self.canvas["height"])
+        return width, height
+
+    def to_screen(self, x, y):
+        return (x - self.origin_x) * self.zoom, (y - self.origin_y) * self.zoom
+
+    def fit(self, margin=30):
+        """Zoom and pan so the whole map is visible."""
+        width, height = self._size()
+        span_x = max(self.index.max_x - self.index.min_x, 1)
+        span_y = max(self.index.max_y - self.index.min_y, 1)
+        self.zoom = min((width - 2 * margin) / span_x, (height - 2 * margin) / span_y)
+        self.origin_x = self.index.min_x - margin / self.zoom
+        self.origin_y = self.index.min_y - margin / self.zoom
+        self.schedule_redraw()
+
+    def zoom_at(self, sx, sy, factor):
+        # Keep the world point under the cursor fixed
+        wx, wy = self.origin_x + sx / self.zoom, self.origin_y + sy / self.zoom
+        self.zoom *= factor
+        self.origin_x = wx - sx / self.zoom
+        self.origin_y = wy - sy / self.zoom
+        self.schedule_redraw()
+
+    def _on_press(self, event):
+        self._drag_start = (event.x, event.y)
+
+    def _on_drag(self, event):
+        if self._drag_start is None:
+            return
+        dx, dy = event.x - self._drag_start[0], event.y - self._drag_start[1]
+        self._drag_start = (event.x, event.y)
+        self.origin_x -= dx / self.zoom
+        self.origin_y -= dy / self.zoom
+        self.schedule_redraw()
+
+    def _on_wheel(self, event):
+        self.zoom_at(event.x, event.y, 1.25 if event.delta > 0 else 0.8)
+
+    def schedule_redraw(self):
+        """Redraw once the event loop is idle; repeated calls are merged."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        self._redraw_pending = False
+        canvas, graph = self.canvas, self.graph
+        xs, ys = graph.xs, graph.ys
+        canvas.delete("map")
+        width, height = self._size()
+        margin = self.node_radius / self.zoom
+        view = (self.origin_x - margin, self.origin_y - margin,
+                self.origin_x + width / self.zoom + margin, self.origin_y + height / self.zoom + margin)
+
+        if self.index.cell_count(*view) > DETAIL_CELLS:
+            self.items_drawn = self._draw_overview(view)
+            return
+
+        nodes, edges = self.index.query(*view)
+        drawn = 0
+
+        for edge_id in edges:
+            u, v = self.index.edge_list[edge_id]
+            x0, y0 = self.to_screen(xs[u], ys[u])
+            x1, y1 = self.to_screen(xs[v], ys[v])
+            highlighted = (u, v) in self.highlighted_edges
+            if not highlighted and abs(x1 - x0) + abs(y1 - y0) < MIN_EDGE_PIXELS:
+                continue
+            canvas.create_line(x0, y0, x1, y1, fill="blue" if highlighted else "gray",
+                               width=3 if highlighted else 1, tags="map")
+            drawn += 1
+
+        if self.zoom >= NODE_ZOOM:
+            r = self.node_radius * min(self.zoom, 1.0)
+            show_labels = self.zoom >= LABEL_ZOOM
+            for node in nodes:
+                x, y = self.to_screen(xs[node], ys[node])
+                if not (-r <= x <= width + r and -r <= y <= height + r):
+                    continue
+                color = "blue" if node in self.highlighted_nodes else "black"
+                canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, tags="map")
+                drawn += 1
+                if show_labels:
+                    canvas.create_text(x, y - r - 5, text=graph.names[node], font=self.font, tags="map")
+                    drawn += 1
+        self.items_drawn = drawn
+
+    # Zoomed far out: shade blocks of the map by how many cities they hold,
+    # and draw only the highlighted route on top
+    def _draw_overview(self, view):
+        canvas, xs, ys = self.canvas, self.graph.xs, self.graph.ys
+        blocks = self.index.density(*view, DETAIL_CELLS)
+        densest = max((count for *_, count in blocks), default=1)
+        for x0, y0, x1, y1, count in blocks:
+            shade = 220 - int(140 * count / densest)
+            sx0, sy0 = self.to_screen(x0, y0)
+            sx1, sy1 = self.to_screen(x1, y1)
+            canvas.create_rectangle(sx0, sy0, sx1, sy1, fill=f"#{shade:02x}{shade:02x}{shade:02x}",
+                                    outline="", tags="map")
+        for u, v in self.highlighted_edges:
+            x0, y0 = self.to_screen(xs[u], ys[u])
+            x1, y1 = self.to_screen(xs[v], ys[v])
+            canvas.create_line(x0, y0, x1, y1, fill="blue", width=3, tags="map")
+        return len(blocks) + len(self.highlighted_edges)
+
+    def clear_route(self):
+        if self._animation is not None:
+            self.canvas.after_cancel(self._animation)
+            self._animation = None
+            # A cut-short animation still reports that it is done
+            on_done, self._on_done = self._on_done, None
+            if on_done is not None:
+                on_done()
+        self.highlighted_nodes.clear()
+        self.highlighted_edges.clear()
+        self.schedule_redraw()
+
+    def animate_route(self, path, delay=500, on_done=None):
+        """Highlight a path of node names one road at a time using after().
+        on_done runs at the end, or straight away if the animation is
+        cleared or replaced before then."""
+        self.clear_route()
+        nodes = [self.graph.node_id(name) for name in path]
+        self._on_done = on_done
+
+        def step(i):
+            self._animation = None
+            self.highlighted_nodes.add(nodes[i])
+            if i + 1 < len(nodes):
+                u, v = nodes[i], nodes[i + 1]
+                self.highlighted_edges.add((u, v) if u < v else (v, u))
+                self.schedule_redraw()
+                self._animation = self.canvas.after(delay, step, i + 1)
+            else:
+                self.schedule_redraw()
+                self._on_done = None
+                if on_done is not None:
+                    on_done()
+
+        step(0)
@@ -0,0 +1,280 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from gomoku import completes_line, neighbourhoods, new_board
+from ttt_engine import PLAYERS
+
+EXPLORATION = 1.4
+
+
+class Node:
+    __slots__ = ("move", "player", "parent", "children", "untried", "result", "visits", "wins")
+
+    def __init__(self, move, player, parent, untried, result):
+        self.move = move
+        self.player = player      # stone (1 X, 2 O) of the side that made move
+        self.parent = parent
+        self.children = []
+        self.untried = untried    # moves not expanded yet
+        self.result = result      # winning stone or 0 (draw) at the end of the game, else None
+        self.visits = 0
+        self.wins = 0.0           # for player: 1 per win, 0.5 per draw
+
+
+# UCT search tree over a private copy of an m x n x k position.  Moves are
+# expanded only near existing stones (gomoku.RADIUS), and each playout fills
+# the remaining cells in random order until someone has k in a row.
+# advance() walks the root down to a later position so the statistics
+# gathered for it on earlier moves are kept.
+class Tree:
+    def __init__(self, rows, cols, k, history, rng):
+        self.rows, self.cols, self.k = rows, cols, k
+        self.rng = rng
+        self.neighbourhood = neighbourhoods(rows, cols)
+        self.cells = [0] * (rows * cols)
+        self.history = []
+        for i in history:
+            self._play(i)
+        last = self.history[-1] if self.history else None
+        self.root = self._node(last, None)
+
+    def _play(self, i):
+        self.cells[i] = len(self.history) % 2 + 1
+        self.history.append(i)
+
+    def _undo(self):
+        self.cells[self.history.pop()] = 0
+
+    def _node(self, move, parent):
+        # Node for the position after move, which must be on the board
+        player = 2 - len(self.history) % 2
+        if move is not None and completes_line(self.cells, self.rows, self.cols, self.k, move):
+            return Node(move, player, parent, [], player)
+        if len(self.history) == len(self.cells):
+            return Node(move, player, parent, [], 0)
+        return Node(move, player, parent, self._moves(), None)
+
+    def _moves(self):
+        cells = self.cells
+        if not self.history:
+            return [(self.rows // 2) * self.cols + self.cols // 2]
+        near = set()
+        for stone in self.history:
+            near.update(self.neighbourhood[stone])
+        return [i for i in near if not cells[i]]
+
+    def advance(self, history):
+        """Move the root to a later position of the same game; False if
+        history does not continue the tree's position."""
+        if history[:len(self.history)] != self.history:
+            return False
+        for i in history[len(self.history):]:
+            child = next((node for node in self.root.children if node.move == i), None)
+            self._play(i)
+            if child is None:
+                child = self._node(i, None)
+            child.parent = None
+            self.root = child
+        return True
+
+    def search(self, deadline):
+        """Run playouts until the deadline (at least one); returns how many."""
+        playouts = 0
+        while True:
+            self._iterate()
+            playouts += 1
+            if time.perf_counter() >= deadline:
+                return playouts
+
+    def _iterate(self):
+        node = self.root
+        depth = len(self.history)
+        # Selection
+        while not node.untried and node.children:
+            scale = EXPLORATION * math.sqrt(math.log(node.visits))
+            node = max(node.children,
+                       key=lambda child: child.wins / child.visits + scale / math.sqrt(child.visits))
+            self._play(node.move)
+        # Expansion
+        if node.untried:
+            untried = node.untried
+            i = untried.pop(self.rng.randrange(len(untried)))
+            self._play(i)
+            child = self._node(i, node)
+            node.children.append(child)
+            node = child
+        result = node.result if node.result is not None else self._playout()
+        while len(self.history) > depth:
+            self._undo()
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if result == node.player:
+                node.wins += 1
+            elif not result:
+                node.wins += 0.5
+            node = node.parent
+
+    def _playout(self):
+        cells, rows, cols, k = self.cells, self.rows, self.cols, self.k
+        empty = [i for i, cell in enumerate(cells) if not cell]
+        self.rng.shuffle(empty)
+        stone = len(self.history) % 2 + 1
+        result = 0
+        for played, i in enumerate(empty):
+            cells[i] = stone
+            if completes_line(cells, rows, cols, k, i):
+                result = stone
+                break
+            stone = 3 - stone
+        for i in empty[:played + 1]:
+            cells[i] = 0
+        return result
+
+    def stats(self):
+        """Visits and wins of each root move."""
+        return {node.move: (node.visits, node.wins) for node in self.root.children}
+
+
+def search(tree, rng, position, budget):
+    # Search position = (rows, cols, k, history) for budget seconds, reusing
+    # tree when the position follows on from it
+    rows, cols, k, history = position
+    reused = 0
+    if tree is not None and (tree.rows, tree.cols, tree.k) == (rows, cols, k) and tree.advance(history):
+        reused = tree.root.visits
+    else:
+        tree = Tree(rows, cols, k, history, rng)
+    playouts = tree.search(time.perf_counter() + budget)
+    return tree, tree.stats(), playouts, reused
+
+
+def worker(conn, seed):
+    # Pool process: keeps its own tree between moves
+    rng = random.Random(seed)
+    tree = None
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        tree, stats, playouts, reused = search(tree, rng, *message)
+        conn.send((stats, playouts, reused))
+
+
+# Monte Carlo tree search computer player for ttt_board.Board or
+# gomoku.GomokuBoard.  With workers > 0 every move is searched by that many
+# processes at once, each growing its own tree from a different seed (root
+# parallelization); their root statistics are summed and the most visited
+# move is played.  Each tree is kept and reused on the next move.
+class MCTSPlayer:
+    def __init__(self, budget_ms=500, workers=None, seed=None):
+        self.budget = budget_ms / 1000
+        self.rng = random.Random(seed)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.tree = None
+        self.pipes = []
+        self.processes = []
+        for _ in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=worker, args=(child, self.rng.getrandbits(64)), daemon=True)
+            process.start()
+            self.pipes.append(parent)
+            self.processes.append(process)
+        # Statistics of the last move
+        self.playouts = 0
+        self.reused = 0
+        self.elapsed = 0.0
+
+    def choose_move(self, board):
+        """(row, col) of the chosen move for the side to move."""
+        return divmod(self.search(board), board.cols)
+
+    def search(self, board):
+        started = time.perf_counter()
+        position = (board.rows, board.cols, board.k, list(board.history))
+        if self.pipes:
+            for pipe in self.pipes:
+                pipe.send((position, self.budget))
+            results = [pipe.recv() for pipe in self.pipes]
+        else:
+            self.tree, stats, playouts, reused = search(self.tree, self.rng, position, self.budget)
+            results = [(stats, playouts, reused)]
+        merged = {}
+        for stats, _, _ in results:
+            for move, (visits, wins) in stats.items():
+                total = merged.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += wins
+        self.playouts = sum(result[1] for result in results)
+        self.reused = sum(result[2] for result in results)
+        self.elapsed = time.perf_counter() - started
+        return max(merged, key=lambda move: merged[move])
+
+    def close(self):
+        for pipe in self.pipes:
+            pipe.send(None)
+        for process in self.processes:
+            process.join()
+        self.pipes, self.processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def play_against_random(player, rows, cols, k, games, rng):
+    """Play games against uniformly random moves, alternating who starts;
+    returns (wins, draws, losses, playouts, playouts reused, seconds searching)."""
+    wins = draws = losses = playouts = reused = 0
+    searching = 0.0
+    for game in range(games):
+        board = new_board(rows, cols, k)
+        mcts_turn = game % 2
+        while True:
+            if board.turn == mcts_turn:
+                board.make(player.search(board))
+                playouts += player.playouts
+                reused += player.reused
+                searching += player.elapsed
+            else:
+                board.make(rng.choice(board.legal_moves()))
+            winner = board.winner()
+            if winner or board.is_full():
+                break
+        if winner is None:
+            draws += 1
+        elif winner == PLAYERS[mcts_turn]:
+            wins += 1
+        else:
+            losses += 1
+    return wins, draws, losses, playouts, reused, searching
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS playout speed and strength against random play")
+    parser.add_argument("--rows", type=int, default=9)
+    parser.add_argument("--cols", type=int, default=9)
+    parser.add_argument("-k", type=int, default=5, help="stones in a row to win")
+    parser.add_argument("--budget-ms", type=int, default=200, help="search time per move")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="0 searches in this process")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for workers in sorted({0, args.workers}):
+        with MCTSPlayer(args.budget_ms, workers, args.seed) as player:
+            wins, draws, losses, playouts, reused, searching = play_against_random(
+                player, args.rows, args.cols, args.k, args.games, random.Random(args.seed))
+        print(f"{workers} workers, {args.budget_ms} ms/move on {args.rows}x{args.cols}, {args.k} in a row: "
+              f"{playouts / searching:,.0f} playouts/s, {reused / (playouts + reused):.0%} of visits reused "
+              f"from earlier moves; against random W {wins} D {draws} L {losses}")
+
+
+if __name__ == "__main__":
+    main()
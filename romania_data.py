@@ -0,0 +1,32 @@
+# Define the Romanian map with distances (weighted graph)
+romania_map = {
+    'Arad': {'Sibiu': 140, 'Timisoara': 118, 'Zerind': 75},
+    'Zerind': {'Arad': 75, 'Oradea': 71},
+    'Oradea': {'Zerind': 71, 'Sibiu': 151},
+    'Timisoara': {'Arad': 118, 'Lugoj': 111},
+    'Lugoj': {'Timisoara': 111, 'Mehadia': 70},
+    'Mehadia': {'Lugoj': 70, 'Drobeta': 75},
+    'Drobeta': {'Mehadia': 75, 'Craiova': 120},
+    'Craiova': {'Drobeta': 120, 'Rimnicu Vilcea': 146, 'Pitesti': 138},
+    'Sibiu': {'Arad': 140, 'Oradea': 151, 'Fagaras': 99, 'Rimnicu Vilcea': 80},
+    'Rimnicu Vilcea': {'Sibiu': 80, 'Craiova': 146, 'Pitesti': 97},
+    'Fagaras': {'Sibiu': 99, 'Bucharest': 211},
+    'Pitesti': {'Rimnicu Vilcea': 97, 'Craiova': 138, 'Bucharest': 101},
+    'Bucharest': {'Fagaras': 211, 'Pitesti': 101, 'Giurgiu': 90, 'Urziceni': 85},
+    'Giurgiu': {'Bucharest': 90},
+    'Urziceni': {'Bucharest': 85, 'Hirsova': 98, 'Vaslui': 142},
+    'Hirsova': {'Urziceni': 98, 'Eforie': 86},
+    'Eforie': {'Hirsova': 86},
+    'Vaslui': {'Urziceni': 142, 'Iasi': 92},
+    'Iasi': {'Vaslui': 92, 'Neamt': 87},
+    'Neamt': {'Iasi': 87}
+}
+
+# Define positions for each city for visualization purposes
+city_positions = {
+    'Arad': (50, 300), 'Zerind': (70, 200), 'Oradea': (90, 120), 'Timisoara': (100, 400),
+    'Lugoj': (150, 500), 'Mehadia': (200, 600), 'Drobeta': (250, 700), 'Craiova': (350, 650),
+    'Sibiu': (150, 200), 'Rimnicu Vilcea': (250, 300), 'Fagaras': (300, 200), 'Pitesti': (400, 400),
+    'Bucharest': (500, 300), 'Giurgiu': (550, 400), 'Urziceni': (550, 200), 'Hirsova': (650, 150),
+    'Eforie': (700, 100), 'Vaslui': (650, 250), 'Iasi': (600, 300), 'Neamt': (550, 350)
+}
@@ -0,0 +1,344 @@
+import heapq
+import math
+from array import array
+from collections import namedtuple
+
+# Result of a route query: list of node names, total distance and the
+# number of nodes settled by the search
+Route = namedtuple("Route", ["path", "distance", "expanded"])
+
+NO_PARENT = -1
+
+
+# Compact road graph: nodes are numbered 0..n-1 and the outgoing edges of
+# node i are targets[offsets[i]:offsets[i + 1]] with matching weights (CSR)
+class Graph:
+    def __init__(self, names, offsets, targets, weights, xs=None, ys=None, index=None):
+        self.names = names
+        self._index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        # Optional planar coordinates, used by the A* heuristic
+        self.xs = xs
+        self.ys = ys
+        self._reverse = None
+        self._heuristic_scale = None
+
+    @classmethod
+    def from_dict(cls, adjacency, positions=None):
+        """Build a graph from the dict-of-dicts format used by romania_map."""
+        names = list(adjacency)
+        index = {name: i for i, name in enumerate(names)}
+        for neighbors in adjacency.values():
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = len(names)
+                    names.append(neighbor)
+        edges = []
+        for city, neighbors in adjacency.items():
+            for neighbor, distance in neighbors.items():
+                edges.append((index[city], index[neighbor], distance))
+        coords = [positions[name] for name in names] if positions else None
+        return cls.from_edges(names, edges, coords)
+
+    @classmethod
+    def from_edges(cls, names, edges, coords=None):
+        """Build a graph from (source, target, weight) triples of node numbers."""
+        sources, targets, weights = array("q"), array("q"), array("d")
+        for u, v, w in edges:
+            sources.append(u)
+            targets.append(v)
+            weights.append(w)
+        return cls.from_arrays(names, sources, targets, weights, coords)
+
+    @classmethod
+    def from_arrays(cls, names, sources, targets, weights, coords=None):
+        """Build a graph from parallel arrays of edge sources, targets and weights."""
+        n = len(names)
+        m = len(sources)
+        counts = [0] * (n + 1)
+        for u in sources:
+            counts[u + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        offsets = array("q", counts)
+        csr_targets = array("q", bytes(8 * m))
+        csr_weights = array("d", bytes(8 * m))
+        fill = counts[:-1]
+        for e in range(m):
+            u = sources[e]
+            slot = fill[u]
+            csr_targets[slot] = targets[e]
+            csr_weights[slot] = weights[e]
+            fill[u] = slot + 1
+        if coords is None:
+            return cls(names, offsets, csr_targets, csr_weights)
+        xs = array("d", (x for x, _ in coords))
+        ys = array("d", (y for _, y in coords))
+        return cls(names, offsets, csr_targets, csr_weights, xs, ys)
+
+    @property
+    def index(self):
+        """Mapping from node name to node number, built on first use."""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index
+
+    def __len__(self):
+        return len(self.names)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def neighbors(self, node):
+        """Yield (target, weight) pairs for the outgoing edges of a node number."""
+        targets, weights = self.targets, self.weights
+        for e in range(self.offsets[node], self.offsets[node + 1]):
+            yield targets[e], weights[e]
+
+    def node_id(self, name):
+        try:
+            return self.index[name]
+        except KeyError:
+            raise ValueError(f"Unknown city: {name}") from None
+
+    def set_weight(self, u, v, weight):
+        """Change the weight of every edge from node number u to v; returns how many."""
+        changed = 0
+        for e in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[e] == v:
+                self.weights[e] = weight
+                changed += 1
+        if changed:
+            # The reversed copy and heuristic scale were derived from the old weights
+            self._reverse = None
+            self._heuristic_scale = None
+        return changed
+
+    def has_coordinates(self):
+        return self.xs is not None
+
+    def reverse(self):
+        """Return the graph with every edge flipped (cached)."""
+        if self._reverse is None:
+            sources = array("q")
+            for u in range(len(self)):
+                sources.extend([u] * (self.offsets[u + 1] - self.offsets[u]))
+            rev = Graph.from_arrays(self.names, self.targets, sources, self.weights)
+            rev.xs, rev.ys = self.xs, self.ys
+            rev._reverse = self
+            rev._heuristic_scale = self._heuristic_scale
+            self._reverse = rev
+        return self._reverse
+
+    def heuristic_scale(self):
+        """Largest factor k with k * straight-line distance <= weight on every edge.
+
+        Coordinates are not necessarily in the same unit as the weights (the
+        Romania map uses canvas pixels and kilometres), so the straight-line
+        distance is scaled down until it never overestimates a road.  That
+        keeps the A* heuristic admissible and consistent.
+        """
+        if self._heuristic_scale is None:
+            scale = float("inf")
+            xs, ys = self.xs, self.ys
+            for u in range(len(self)):
+                for e in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[e]
+                    length = math.hypot(xs[u] - xs[v], ys[u] - ys[v])
+                    if length > 0:
+                        scale = min(scale, self.weights[e] / length)
+            self._heuristic_scale = 0.0 if scale == float("inf") else scale
+        return self._heuristic_scale
+
+    def straight_line(self, goal):
+        """Return an admissible estimate of the distance from a node to goal."""
+        if not self.has_coordinates():
+            raise ValueError("Graph has no coordinates for the A* heuristic")
+        xs, ys = self.xs, self.ys
+        gx, gy = xs[goal], ys[goal]
+        scale = self.heuristic_scale()
+        hypot = math.hypot
+
+        def estimate(node):
+            return scale * hypot(xs[node] - gx, ys[node] - gy)
+
+        return estimate
+
+
+# Follow parent pointers back from the goal and return the path as names
+def build_path(graph, parent, goal):
+    path = []
+    node = goal
+    while node != NO_PARENT:
+        path.append(graph.names[node])
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+# Return a weight as int when it has no fractional part, so the Romania map
+# keeps reporting whole kilometres
+def tidy_distance(distance):
+    if distance != float("inf") and distance == int(distance):
+        return int(distance)
+    return distance
+
+
+# Dijkstra's algorithm on a binary heap with parent pointers; the path is
+# reconstructed once when the goal is settled
+def dijkstra(graph, start, goal):
+    return astar(graph, start, goal, heuristic=None)
+
+
+# A* search: Dijkstra ordered by distance so far plus an admissible estimate
+# of the remaining distance (straight-line by default)
+def astar(graph, start, goal, heuristic="straight-line"):
+    source = graph.node_id(start)
+    target = graph.node_id(goal)
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    if heuristic == "straight-line":
+        heuristic = graph.straight_line(target)
+
+    dist = {source: 0}
+    parent = {source: NO_PARENT}
+    settled = set()
+    frontier = [(heuristic(source) if heuristic else 0, 0, source)]
+    expanded = 0
+
+    while frontier:
+        _, d, node = heapq.heappop(frontier)
+        if node in settled:
+            continue
+        settled.add(node)
+        expanded += 1
+
+        if node == target:
+            return Route(build_path(graph, parent, target), tidy_distance(d), expanded)
+
+        for e in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[e]
+            nd = d + weights[e]
+            if nd < dist.get(neighbor, float("inf")):
+                dist[neighbor] = nd
+                parent[neighbor] = node
+                key = nd + heuristic(neighbor) if heuristic else nd
+                heapq.heappush(frontier, (key, nd, neighbor))
+
+    return Route(None, float("inf"), expanded)  # No path found
+
+
+# Single-source Dijkstra over the whole graph.  Takes a node number and
+# returns per-node lists of distances (inf if unreachable) and parents.
+# If stop_at is given the search ends once all of those nodes are settled.
+def shortest_path_tree(graph, source, stop_at=None):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    inf = float("inf")
+    dist = [inf] * len(graph)
+    parent = [NO_PARENT] * len(graph)
+    done = bytearray(len(graph))
+    dist[source] = 0
+    frontier = [(0, source)]
+    remaining = set(stop_at) if stop_at is not None else None
+
+    while frontier:
+        d, node = heapq.heappop(frontier)
+        if done[node]:
+            continue
+        done[node] = 1
+        if remaining is not None:
+            remaining.discard(node)
+            if not remaining:
+                break
+        for e in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[e]
+            nd = d + weights[e]
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                parent[neighbor] = node
+                heapq.heappush(frontier, (nd, neighbor))
+
+    return dist, parent
+
+
+# Bidirectional search: one frontier grows from the start over the graph and
+# one from the goal over the reversed graph until they meet.  With use_astar
+# both sides are ordered by the averaged potential
+#     p(v) = (h_goal(v) - h_start(v)) / 2
+# which keeps the reduced edge weights non-negative, so the usual stopping
+# rule (top of both heaps >= best meeting distance) stays exact.
+def bidirectional(graph, start, goal, use_astar=False):
+    source = graph.node_id(start)
+    target = graph.node_id(goal)
+    if source == target:
+        return Route([start], 0, 1)
+
+    if use_astar:
+        to_goal = graph.straight_line(target)
+        from_start = graph.straight_line(source)
+
+        def potential(node):
+            return (to_goal(node) - from_start(node)) / 2
+    else:
+        def potential(node):
+            return 0
+
+    sides = [
+        (graph, {source: 0}, {source: NO_PARENT}, set(), [(potential(source), 0, source)], 1),
+        (graph.reverse(), {target: 0}, {target: NO_PARENT}, set(), [(-potential(target), 0, target)], -1),
+    ]
+    best = float("inf")
+    meeting = None
+    expanded = 0
+
+    while sides[0][4] and sides[1][4]:
+        if sides[0][4][0][0] + sides[1][4][0][0] >= best:
+            break
+        # Advance the side with the smaller frontier
+        side = 0 if len(sides[0][4]) <= len(sides[1][4]) else 1
+        g, dist, parent, settled, frontier, sign = sides[side]
+        other_dist = sides[1 - side][1]
+
+        _, d, node = heapq.heappop(frontier)
+        if node in settled:
+            continue
+        settled.add(node)
+        expanded += 1
+
+        for e in range(g.offsets[node], g.offsets[node + 1]):
+            neighbor = g.targets[e]
+            nd = d + g.weights[e]
+            if nd < dist.get(neighbor, float("inf")):
+                dist[neighbor] = nd
+                parent[neighbor] = node
+                heapq.heappush(frontier, (nd + sign * potential(neighbor), nd, neighbor))
+                if neighbor in other_dist and nd + other_dist[neighbor] < best:
+                    best = nd + other_dist[neighbor]
+                    meeting = neighbor
+
+    if meeting is None:
+        return Route(None, float("inf"), expanded)  # No path found
+
+    forward = build_path(graph, sides[0][2], meeting)
+    backward = build_path(graph, sides[1][2], meeting)
+    backward.reverse()
+    return Route(forward + backward[1:], tidy_distance(best), expanded)
+
+
+# Search methods selectable by name from the GUI and the API
+METHODS = {
+    "dijkstra": dijkstra,
+    "astar": astar,
+    "bidirectional": bidirectional,
+    "bidirectional-astar": lambda graph, start, goal: bidirectional(graph, start, goal, use_astar=True),
+}
+
+
+def shortest_path(graph, start, goal, method="dijkstra"):
+    """Run the named search method and return a Route."""
+    try:
+        search = METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown search method: {method}") from None
+    return search(graph, start, goal)
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from romania_data import romania_map
+from route_server import percentile
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def request(reader, writer, message):
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+# One client connection sending route requests back to back
+async def client(args, pairs, weights, seed, latencies):
+    rng = random.Random(seed)
+    reader, writer = await open_connection(args)
+    try:
+        for _ in range(args.requests):
+            start, goal = rng.choices(pairs, weights)[0]
+            started = time.perf_counter()
+            reply = await request(reader, writer, {"op": "route", "start": start, "goal": goal,
+                                                   "method": args.method})
+            latencies.append(time.perf_counter() - started)
+            if not reply["ok"]:
+                raise SystemExit(f"Server error: {reply['error']}")
+    finally:
+        writer.close()
+
+
+async def run(args):
+    reader, writer = await open_connection(args)
+    # Node names to query: given on the command line, or the Romania map
+    cities = args.cities or list(romania_map)
+    rng = random.Random(0)
+    pairs = [(a, b) for a in cities for b in cities if a != b]
+    rng.shuffle(pairs)
+    # Zipf-like popularity so some pairs repeat, as at a kiosk
+    weights = [1 / (rank + 1) for rank in range(len(pairs))]
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(args, pairs, weights, seed, latencies) for seed in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    stats = await request(reader, writer, {"op": "stats"})
+    writer.close()
+
+    total = args.clients * args.requests
+    print(f"{total} requests from {args.clients} clients in {elapsed:.2f} s: {total / elapsed:,.0f} req/s")
+    print(f"client latency  p50 {percentile(latencies, 0.50) * 1000:.3f} ms  p99 {percentile(latencies, 0.99) * 1000:.3f} ms")
+    print(f"server          p50 {stats['p50_ms']:.3f} ms  p99 {stats['p99_ms']:.3f} ms  "
+          f"cache hit rate {stats['hit_rate']:.1%} ({stats['cache_size']} entries)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for route_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per client")
+    parser.add_argument("--method", default="dijkstra")
+    parser.add_argument("--cities", nargs="+", help="node names to query (default: the Romania map)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from array import array
+from collections import OrderedDict, deque
+
+import route_engine
+from graph_file import load_graph
+from romania_data import city_positions, romania_map
+from route_engine import Graph
+
+# Latencies kept for the p50/p99 figures
+LATENCY_WINDOW = 10000
+
+
+# Bounded least-recently-used cache with hit/miss counters
+class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def reject_constant(name):
+    # json.loads hook: Infinity and NaN are not JSON
+    raise ValueError(f"Invalid JSON constant: {name}")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Keeps one graph loaded and answers newline-delimited JSON requests:
+#   {"op": "route", "start": "Arad", "goal": "Bucharest", "method": "astar"}
+#   {"op": "update_edge", "u": "Arad", "v": "Sibiu", "weight": 150, "both_directions": true}
+#     (weight a finite number >= 0)
+#   {"op": "stats"}
+# Every reply is one JSON line with "ok" set, and "error" when it is false.
+# An unreachable goal has "path" and "distance" null.
+class RouteServer:
+    def __init__(self, graph, cache_size=10000):
+        self.graph = graph
+        self.cache = LRUCache(cache_size)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+
+    def handle(self, request):
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        op = request.get("op")
+        if op == "route":
+            return self.route(request["start"], request["goal"], request.get("method", "dijkstra"))
+        if op == "update_edge":
+            return self.update_edge(request["u"], request["v"], request["weight"],
+                                    request.get("both_directions", False))
+        if op == "stats":
+            return self.stats()
+        raise ValueError(f"Unknown op: {op}")
+
+    def route(self, start, goal, method):
+        key = (start, goal, method)
+        route = self.cache.get(key)
+        cached = route is not None
+        if not cached:
+            route = route_engine.shortest_path(self.graph, start, goal, method)
+            self.cache.put(key, route)
+        distance = route.distance if math.isfinite(route.distance) else None
+        return {"ok": True, "path": route.path, "distance": distance,
+                "expanded": route.expanded, "cached": cached}
+
+    def update_edge(self, u, v, weight, both_directions):
+        # bool is an int, and NaN or negative weights break every search
+        if (not isinstance(weight, (int, float)) or isinstance(weight, bool)
+                or not math.isfinite(weight) or weight < 0):
+            raise ValueError(f"Weight must be a finite number >= 0, not {weight!r}")
+        source, target = self.graph.node_id(u), self.graph.node_id(v)
+        changed = self.graph.set_weight(source, target, weight)
+        if both_directions:
+            changed += self.graph.set_weight(target, source, weight)
+        if not changed:
+            raise ValueError(f"No road from {u} to {v}")
+        # Any cached route may have used the edited road
+        self.cache.clear()
+        return {"ok": True, "changed": changed}
+
+    def stats(self):
+        latencies = list(self.latencies)
+        return {
+            "ok": True,
+            "requests": self.requests,
+            "cache_size": len(self.cache.entries),
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "hit_rate": self.cache.hit_rate(),
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                started = time.perf_counter()
+                try:
+                    reply = self.handle(json.loads(line, parse_constant=reject_constant))
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {"ok": False, "error": str(error)}
+                self.requests += 1
+                self.latencies.append(time.perf_counter() - started)
+                writer.write(json.dumps(reply, allow_nan=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server, host="127.0.0.1", port=8765, unix_path=None):
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.serve_client, path=unix_path)
+        print(f"Route server listening on {unix_path}")
+    else:
+        listener = await asyncio.start_server(server.serve_client, host, port)
+        print(f"Route server listening on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local JSON-over-socket shortest path server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--graph", help="graph file from graph_file.py (default: the Romania map)")
+    parser.add_argument("--cache-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.graph:
+        # Mapped files are read-only, so update_edge works on a copy of the weights
+        mapped = load_graph(args.graph)
+        graph = Graph(mapped.names, mapped.offsets, mapped.targets, array("d", mapped.weights),
+                      mapped.xs, mapped.ys, mapped.index)
+    else:
+        graph = Graph.from_dict(romania_map, city_positions)
+
+    try:
+        asyncio.run(serve(RouteServer(graph, args.cache_size), args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from route_engine import NO_PARENT, Route, shortest_path_tree, tidy_distance
+
+# Above this many nodes Floyd-Warshall's O(n^3) loses to one Dijkstra per node
+FLOYD_WARSHALL_LIMIT = 1500
+
+
+# Fingerprint of the graph contents; the cached table is reused only while
+# this stays the same
+def graph_hash(graph):
+    digest = hashlib.sha256()
+    digest.update("\0".join(graph.names).encode("utf-8"))
+    for column in (graph.offsets, graph.targets, graph.weights):
+        digest.update(np.asarray(column).tobytes())
+    return digest.hexdigest()
+
+
+# Vectorized Floyd-Warshall: one n x n relaxation per intermediate node k
+def floyd_warshall(graph):
+    n = len(graph)
+    dist = np.full((n, n), np.inf)
+    next_hop = np.full((n, n), NO_PARENT, dtype=np.int32)
+    for u in range(n):
+        for e in range(graph.offsets[u], graph.offsets[u + 1]):
+            v = graph.targets[e]
+            if graph.weights[e] < dist[u, v]:
+                dist[u, v] = graph.weights[e]
+                next_hop[u, v] = v
+    np.fill_diagonal(dist, 0)
+    np.fill_diagonal(next_hop, np.arange(n, dtype=np.int32))
+
+    for k in range(n):
+        through_k = dist[:, k, None] + dist[None, k, :]
+        shorter = through_k < dist
+        np.copyto(dist, through_k, where=shorter)
+        np.copyto(next_hop, np.broadcast_to(next_hop[:, k, None], (n, n)), where=shorter)
+    return dist, next_hop
+
+
+# One single-source Dijkstra per node; better for large sparse graphs
+def repeated_dijkstra(graph):
+    n = len(graph)
+    dist = np.empty((n, n))
+    next_hop = np.full((n, n), NO_PARENT, dtype=np.int32)
+    for source in range(n):
+        row, parent = shortest_path_tree(graph, source)
+        dist[source] = row
+        # The first hop of a node is its ancestor just below the source.
+        # Walk up the tree to the nearest node whose hop is known and fill
+        # in the whole chain; distance order is not enough, as a zero-weight
+        # edge lets a child tie with its parent
+        hops = next_hop[source]
+        hops[source] = source
+        for node in range(n):
+            if hops[node] != NO_PARENT or parent[node] == NO_PARENT:
+                continue
+            chain = []
+            while hops[node] == NO_PARENT and parent[node] != source:
+                chain.append(node)
+                node = parent[node]
+            if hops[node] == NO_PARENT:
+                hops[node] = node  # a child of the source is its own first hop
+            for child in chain:
+                hops[child] = hops[node]
+    return dist, next_hop
+
+
+# Precomputed distance and next-hop matrices; a query is a walk along
+# next_hop and costs O(path length)
+class RouteTable:
+    def __init__(self, names, dist, next_hop, digest):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.dist = dist
+        self.next_hop = next_hop
+        self.digest = digest
+
+    @classmethod
+    def build(cls, graph, method=None):
+        if method is None:
+            method = "floyd-warshall" if len(graph) <= FLOYD_WARSHALL_LIMIT else "dijkstra"
+        if method == "floyd-warshall":
+            dist, next_hop = floyd_warshall(graph)
+        elif method == "dijkstra":
+            dist, next_hop = repeated_dijkstra(graph)
+        else:
+            raise ValueError(f"Unknown all-pairs method: {method}")
+        return cls(list(graph.names), dist, next_hop, graph_hash(graph))
+
+    def save(self, prefix):
+        """Write <prefix>.dist.npy, <prefix>.next.npy and <prefix>.json."""
+        np.save(prefix + ".dist.npy", self.dist)
+        np.save(prefix + ".next.npy", self.next_hop)
+        with open(prefix + ".json", "w") as meta:
+            json.dump({"hash": self.digest, "names": self.names}, meta)
+
+    @classmethod
+    def load(cls, prefix):
+        """Memory-map a table written by save()."""
+        with open(prefix + ".json") as meta:
+            header = json.load(meta)
+        dist = np.load(prefix + ".dist.npy", mmap_mode="r")
+        next_hop = np.load(prefix + ".next.npy", mmap_mode="r")
+        return cls(header["names"], dist, next_hop, header["hash"])
+
+    @classmethod
+    def load_or_build(cls, graph, prefix):
+        """Load the cached table for graph, rebuilding it if the graph changed."""
+        digest = graph_hash(graph)
+        if os.path.exists(prefix + ".json"):
+            try:
+                table = cls.load(prefix)
+            except (OSError, ValueError):
+                table = None
+            if table is not None and table.digest == digest:
+                return table
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        table = cls.build(graph)
+        table.save(prefix)
+        return table
+
+    def is_current(self, graph):
+        return self.digest == graph_hash(graph)
+
+    def distance(self, start, goal):
+        return tidy_distance(float(self.dist[self._id(start), self._id(goal)]))
+
+    def route(self, start, goal):
+        """Return the shortest route as a Route; nothing is searched."""
+        source, target = self._id(start), self._id(goal)
+        if self.next_hop[source, target] == NO_PARENT:
+            return Route(None, float("inf"), 0)  # No path found
+        path = [start]
+        node = source
+        while node != target:
+            node = int(self.next_hop[node, target])
+            path.append(self.names[node])
+        return Route(path, tidy_distance(float(self.dist[source, target])), 0)
+
+    def _id(self, name):
+        try:
+            return self.index[name]
+        except KeyError:
+            raise ValueError(f"Unknown city: {name}") from None
@@ -0,0 +1,206 @@
+import heapq
+import math
+import time
+
+from dirt_index import DirtIndex
+
+NEIGHBOURS = 8  # candidate cells per cell for 2-opt and Or-opt moves
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def tour_length(start, order):
+    """Manhattan steps to visit the cells in order, beginning at start."""
+    total = 0
+    current = start
+    for cell in order:
+        total += manhattan(current, cell)
+        current = cell
+    return total
+
+
+def nearest_neighbour_tour(start, cells):
+    """Visit the nearest unvisited cell each time; one index query per cell."""
+    index = DirtIndex(cells)
+    order = []
+    current = start
+    while index:
+        current = index.nearest(*current)
+        index.remove(current)
+        order.append(current)
+    return order
+
+
+# When the improvement phase stops: after a number of seconds, or after a
+# number of improving moves.  A move budget gives the same tour on any
+# machine and under any load, which seeded evaluations need.
+class _Budget:
+    def __init__(self, seconds=None, moves=None):
+        self.deadline = None if seconds is None else time.perf_counter() + seconds
+        self.moves = moves
+
+    def spent(self):
+        if self.moves is not None and self.moves <= 0:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def used(self):
+        """Count one improving move."""
+        if self.moves is not None:
+            self.moves -= 1
+
+
+# Approximate k nearest cells of every point, found among the points in the
+# surrounding 3x3 grid buckets
+def _neighbour_lists(points, k):
+    if len(points) < 2:
+        return [[] for _ in points]
+    rows = [p[0] for p in points]
+    cols = [p[1] for p in points]
+    area = (max(rows) - min(rows) + 1) * (max(cols) - min(cols) + 1)
+    size = max(1, int(math.sqrt(area * k / len(points))))
+    buckets = {}
+    for i, (row, col) in enumerate(points):
+        buckets.setdefault((row // size, col // size), []).append(i)
+    neighbours = []
+    for i, (row, col) in enumerate(points):
+        br, bc = row // size, col // size
+        nearby = [j for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                  for j in buckets.get((br + dr, bc + dc), ()) if j != i]
+        neighbours.append(heapq.nsmallest(k, nearby, key=lambda j: manhattan(points[i], points[j])))
+    return neighbours
+
+
+# 2-opt on an open path whose first point is fixed: replace edges (a, b) and
+# (c, d) by (a, c) and (b, d) by reversing b..c.  Only moves that create an
+# edge to one of a's candidate neighbours are tried.
+def _two_opt(points, path, neighbours, budget):
+    n = len(path)
+    position = [0] * n
+    for i, p in enumerate(path):
+        position[p] = i
+    improved = True
+    while improved and not budget.spent():
+        improved = False
+        for i in range(n - 1):
+            a, b = path[i], path[i + 1]
+            ab = manhattan(points[a], points[b])
+            for c in neighbours[a]:
+                j = position[c]
+                if j <= i + 1:
+                    continue
+                gain = ab - manhattan(points[a], points[c])
+                if j + 1 < n:
+                    d = path[j + 1]
+                    gain += manhattan(points[c], points[d]) - manhattan(points[b], points[d])
+                if gain > 0:
+                    path[i + 1:j + 1] = path[i + 1:j + 1][::-1]
+                    for k in range(i + 1, j + 1):
+                        position[path[k]] = k
+                    budget.used()
+                    improved = True
+                    break
+            if budget.spent():
+                break
+    return path
+
+
+# Or-opt: move a run of 1-3 points, possibly reversed, next to one of the
+# candidate neighbours of its first point
+def _or_opt(points, path, neighbours, budget):
+    def dist(p, q):
+        return manhattan(points[p], points[q])
+
+    improved = True
+    while improved and not budget.spent():
+        improved = False
+        position = {p: i for i, p in enumerate(path)}
+        n = len(path)
+        for length in (1, 2, 3):
+            for i in range(1, n - length + 1):
+                segment = path[i:i + length]
+                first, last = segment[0], segment[-1]
+                prev = path[i - 1]
+                after = path[i + length] if i + length < n else None
+                removed = dist(prev, first)
+                if after is not None:
+                    removed += dist(last, after) - dist(prev, after)
+                for c in neighbours[first]:
+                    j = position[c]
+                    if i - 1 <= j < i + length:
+                        continue
+                    nxt = path[j + 1] if j + 1 < n else None
+                    if nxt is not None and i <= j + 1 < i + length:
+                        continue
+                    # Insert between c and nxt, in whichever direction is cheaper
+                    base = -dist(c, nxt) if nxt is not None else 0
+                    forward = dist(c, first) + (dist(last, nxt) if nxt is not None else 0)
+                    backward = dist(c, last) + (dist(first, nxt) if nxt is not None else 0)
+                    added = base + min(forward, backward)
+                    if added < removed:
+                        if backward < forward:
+                            segment = segment[::-1]
+                        rest = path[:i] + path[i + length:]
+                        at = rest.index(c) + 1
+                        path[:] = rest[:at] + segment + rest[at:]
+                        budget.used()
+                        improved = True
+                        break
+                if improved or budget.spent():
+                    break
+            if improved or budget.spent():
+                break
+    return path
+
+
+def plan_tour(start, cells, time_budget=0.5, max_moves=None):
+    """Order in which to visit cells: nearest-neighbour construction, then
+    2-opt and Or-opt improvement until time_budget seconds have passed or,
+    if max_moves is given, until that many improving moves have been made
+    (the time budget is then ignored, so the result is reproducible)."""
+    budget = _Budget(None if max_moves is not None else time_budget, max_moves)
+    order = nearest_neighbour_tour(start, cells)
+    if len(order) < 3:
+        return order
+    points = [tuple(start)] + order
+    neighbours = _neighbour_lists(points, NEIGHBOURS)
+    path = list(range(len(points)))
+    while not budget.spent():
+        before = tour_length(points[0], [points[p] for p in path[1:]])
+        _two_opt(points, path, neighbours, budget)
+        _or_opt(points, path, neighbours, budget)
+        if tour_length(points[0], [points[p] for p in path[1:]]) >= before:
+            break
+    return [points[p] for p in path[1:]]
+
+
+# Steps the vacuum takes to clean every cell, moving one row or column at a
+# time like VacuumCleanerApp.move_vacuum and cleaning any dirty cell it
+# passes.  With no order it re-picks the nearest dirty cell every step, as
+# auto_clean does; otherwise it heads for the next still-dirty cell in order.
+def count_steps(start, cells, order=None):
+    dirty = DirtIndex(cells)
+    row, col = start
+    dirty.discard((row, col))
+    steps = 0
+    next_index = 0
+    while dirty:
+        if order is None:
+            target = dirty.nearest(row, col)
+        else:
+            while order[next_index] not in dirty:
+                next_index += 1
+            target = order[next_index]
+        if row < target[0]:
+            row += 1
+        elif row > target[0]:
+            row -= 1
+        elif col < target[1]:
+            col += 1
+        else:
+            col -= 1
+        steps += 1
+        dirty.discard((row, col))
+    return steps
@@ -0,0 +1,148 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from ttt_engine import EMPTY, LINES, PLAYERS, POWERS
+
+FULL = (1 << 9) - 1
+WIN_MASKS = [sum(1 << i for i in line) for line in LINES]
+# WINS[mask] is 1 when the cells in mask contain three in a row
+WINS = bytes(int(any(mask & line == line for line in WIN_MASKS)) for mask in range(1 << 9))
+# FREE[occupied] lists the empty cells of an occupancy mask
+FREE = [tuple(i for i in range(9) if not occupied >> i & 1) for occupied in range(1 << 9)]
+
+
+# Tic-Tac-Toe position as two 9-bit masks, one per player.  Cell i is bit i
+# (row-major).  Only the player who just moved can have won, so winner() is
+# one table lookup; make/unmake keep the engine's base-3 code up to date so
+# ttt_engine lookups need no re-encoding.
+class Board:
+    __slots__ = ("masks", "turn", "code", "history")
+    rows = cols = k = 3  # the same shape attributes as gomoku.GomokuBoard
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.masks = [0, 0]
+        self.turn = 0  # index into PLAYERS of the side to move
+        self.code = 0
+        self.history = []
+
+    @property
+    def player(self):
+        return PLAYERS[self.turn]
+
+    def occupied(self):
+        return self.masks[0] | self.masks[1]
+
+    def is_free(self, i):
+        return not (self.masks[0] | self.masks[1]) >> i & 1
+
+    def legal_moves(self):
+        return FREE[self.masks[0] | self.masks[1]]
+
+    def make(self, i):
+        """Play cell i for the side to move; the cell must be free."""
+        turn = self.turn
+        self.masks[turn] |= 1 << i
+        self.code += POWERS[i] * (turn + 1)
+        self.history.append(i)
+        self.turn = 1 - turn
+
+    def unmake(self):
+        """Take back the last move."""
+        i = self.history.pop()
+        turn = 1 - self.turn
+        self.masks[turn] &= ~(1 << i)
+        self.code -= POWERS[i] * (turn + 1)
+        self.turn = turn
+
+    def winner(self):
+        """'X' or 'O' if the last move made three in a row, else None."""
+        last = 1 - self.turn
+        return PLAYERS[last] if WINS[self.masks[last]] else None
+
+    def is_full(self):
+        return self.masks[0] | self.masks[1] == FULL
+
+    def is_over(self):
+        return bool(WINS[self.masks[1 - self.turn]]) or self.is_full()
+
+    def cell(self, i):
+        if self.masks[0] >> i & 1:
+            return PLAYERS[0]
+        if self.masks[1] >> i & 1:
+            return PLAYERS[1]
+        return EMPTY
+
+    def cells(self):
+        return [self.cell(i) for i in range(9)]
+
+    def __str__(self):
+        cells = self.cells()
+        return "\n".join(" ".join(cells[r * 3:r * 3 + 3]) for r in range(3))
+
+
+def play_random_game(rng=random):
+    """Random self-play on a Board; returns 'X', 'O' or None for a draw."""
+    board = Board()
+    while True:
+        board.make(rng.choice(board.legal_moves()))
+        winner = board.winner()
+        if winner or board.is_full():
+            return winner
+
+
+# FREE as an array padded to 9 columns, for drawing moves in bulk
+FREE_TABLE = np.array([moves + (0,) * (9 - len(moves)) for moves in FREE], dtype=np.int64)
+WINS_TABLE = np.frombuffer(WINS, dtype=np.uint8).astype(bool)
+
+
+def play_random_games(count, rng=None):
+    """Play count random games at once with NumPy; returns (X wins, O wins, draws)."""
+    if rng is None:
+        rng = np.random.default_rng()
+    masks = np.zeros((2, count), dtype=np.int64)
+    result = np.zeros(count, dtype=np.int8)  # 0 running or drawn, 1 X won, 2 O won
+    running = np.ones(count, dtype=bool)
+    for ply in range(9):
+        turn = ply % 2
+        games = np.flatnonzero(running)
+        occupied = masks[0, games] | masks[1, games]
+        choice = rng.integers(0, 9 - ply, len(games))
+        masks[turn, games] |= 1 << FREE_TABLE[occupied, choice]
+        won = WINS_TABLE[masks[turn, games]]
+        result[games[won]] = turn + 1
+        running[games[won]] = False
+    x_wins = int(np.count_nonzero(result == 1))
+    o_wins = int(np.count_nonzero(result == 2))
+    return x_wins, o_wins, count - x_wins - o_wins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random self-play speed on the bitboard")
+    parser.add_argument("--games", type=int, default=200000, help="games played one at a time")
+    parser.add_argument("--batch", type=int, default=5000000, help="games played at once with NumPy")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    counts = {'X': 0, 'O': 0, None: 0}
+    started = time.perf_counter()
+    for _ in range(args.games):
+        counts[play_random_game(rng)] += 1
+    elapsed = time.perf_counter() - started
+    print(f"{args.games:,} games one by one in {elapsed:.2f} s ({args.games / elapsed:,.0f} games/s): "
+          f"X {counts['X']}, O {counts['O']}, draws {counts[None]}")
+
+    started = time.perf_counter()
+    x_wins, o_wins, draws = play_random_games(args.batch, np.random.default_rng(0))
+    elapsed = time.perf_counter() - started
+    print(f"{args.batch:,} games in bulk in {elapsed:.2f} s ({args.batch / elapsed:,.0f} games/s): "
+          f"X {x_wins / args.batch:.3%}, O {o_wins / args.batch:.3%}, draws {draws / args.batch:.3%}")
+
+
+if __name__ == "__main__":
+    main()
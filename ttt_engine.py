@@ -0,0 +1,201 @@
+import argparse
+import os
+import random
+import time
+
+EMPTY = '_'
+PLAYERS = ('X', 'O')  # X always moves first
+
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+# The 8 symmetries of the board (rotations and reflections), each as the
+# cell that ends up at position 0..8
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8), (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0), (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6), (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8), (8, 5, 2, 7, 4, 1, 6, 3, 0),
+]
+POWERS = [3 ** i for i in range(9)]
+STATES = 3 ** 9  # every board as a base-3 number: digit 0 empty, 1 X, 2 O
+
+# On-disk value table: MAGIC then one signed byte per board code
+MAGIC = b"TTTV0001"
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ttt_cache", "values.bin")
+UNREACHABLE = 127
+
+
+def encode(cells):
+    """Base-3 code of 9 cells ('_', 'X' or 'O'), or of a 3x3 list board."""
+    if len(cells) == 3:
+        cells = [cell for row in cells for cell in row]
+    return sum(POWERS[i] * (0 if cell == EMPTY else 1 if cell == 'X' else 2) for i, cell in enumerate(cells))
+
+
+def decode(code):
+    digits = []
+    for _ in range(9):
+        code, digit = divmod(code, 3)
+        digits.append(digit)
+    return digits
+
+
+def winner_of(digits):
+    """1 or 2 if that player has three in a row, else 0."""
+    for a, b, c in LINES:
+        if digits[a] and digits[a] == digits[b] == digits[c]:
+            return digits[a]
+    return 0
+
+
+def canonical(digits):
+    """Smallest code of the board over its 8 symmetries; the TT key."""
+    return min(sum(POWERS[i] * digits[s[i]] for i in range(9)) for s in SYMMETRIES)
+
+
+# Negamax with alpha-beta over canonical positions.  Scores are from the
+# side to move's point of view: a loss with e empty cells left scores
+# -(e + 1), so quicker wins and slower losses are preferred; a draw is 0.
+# The transposition table keeps exact scores and alpha-beta bounds.
+class Negamax:
+    def __init__(self):
+        self.table = {}  # canonical key -> (flag, score)
+        self.nodes = 0
+
+    def search(self, digits, alpha=-10, beta=10):
+        self.nodes += 1
+        empties = digits.count(0)
+        if winner_of(digits):
+            return -(empties + 1)  # the previous mover just won
+        if not empties:
+            return 0
+        key = canonical(digits)
+        entry = self.table.get(key)
+        if entry is not None:
+            flag, score = entry
+            if flag == 0 or (flag < 0 and score <= alpha) or (flag > 0 and score >= beta):
+                return score
+        mover = 1 if empties % 2 else 2
+        original_alpha = alpha
+        best = -10
+        for i in range(9):
+            if digits[i]:
+                continue
+            digits[i] = mover
+            score = -self.search(digits, -beta, -alpha)
+            digits[i] = 0
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        # flag: -1 upper bound, 0 exact, 1 lower bound
+        flag = -1 if best <= original_alpha else 1 if best >= beta else 0
+        self.table[key] = (flag, best)
+        return best
+
+
+def build_table():
+    """Exact score of every position reachable from the empty board."""
+    engine = Negamax()
+    values = bytearray([UNREACHABLE]) * STATES
+    stack = [0]
+    while stack:
+        code = stack.pop()
+        if values[code] != UNREACHABLE:
+            continue
+        digits = decode(code)
+        values[code] = engine.search(digits, -10, 10) & 0xFF
+        if winner_of(digits) or 0 not in digits:
+            continue
+        mover = 1 if digits.count(0) % 2 else 2
+        for i in range(9):
+            if not digits[i]:
+                stack.append(code + mover * POWERS[i])
+    return values
+
+
+def load_table(path=TABLE_PATH):
+    """Read the cached value table, building and caching it if needed."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] == MAGIC and len(data) == len(MAGIC) + STATES:
+            return data[len(MAGIC):]
+    except OSError:
+        pass
+    values = bytes(build_table())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC + values)
+    os.replace(path + ".tmp", path)
+    return values
+
+
+def score(values, code):
+    value = values[code]
+    return value - 256 if value > 127 else value
+
+
+# Computer player reading every move from the value table
+class PerfectPlayer:
+    def __init__(self, values=None, rng=None):
+        self.values = values if values is not None else load_table()
+        self.rng = rng if rng is not None else random.Random()
+
+    def best_moves(self, board):
+        """All optimal cell numbers for the side to move, given 9 cells, a
+        3x3 list board or a ttt_board.Board (whose code is kept current)."""
+        code = getattr(board, "code", None)
+        if code is None:
+            code = encode(board)
+        digits = decode(code)
+        mover = 1 if digits.count(0) % 2 else 2
+        best, moves = None, []
+        for i in range(9):
+            if digits[i]:
+                continue
+            # The child is scored for the opponent, so minimize it
+            value = -score(self.values, code + mover * POWERS[i])
+            if best is None or value > best:
+                best, moves = value, [i]
+            elif value == best:
+                moves.append(i)
+        return moves
+
+    def choose_move(self, board):
+        """(row, col) of an optimal move; ties at random."""
+        i = self.rng.choice(self.best_moves(board))
+        return divmod(i, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Tic-Tac-Toe value table and time lookups")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cached table")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(TABLE_PATH):
+        os.remove(TABLE_PATH)
+    started = time.perf_counter()
+    values = load_table()
+    elapsed = time.perf_counter() - started
+    reachable = sum(1 for value in values if value != UNREACHABLE)
+    print(f"value table ready in {elapsed * 1000:.2f} ms: {reachable} reachable positions, "
+          f"empty board scores {score(values, 0)}")
+
+    engine = Negamax()
+    started = time.perf_counter()
+    engine.search([0] * 9)
+    print(f"full search from the empty board: {engine.nodes} nodes, {len(engine.table)} TT entries, "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    player = PerfectPlayer(values)
+    board = [[EMPTY] * 3 for _ in range(3)]
+    started = time.perf_counter()
+    for _ in range(10000):
+        player.choose_move(board)
+    print(f"move lookup: {(time.perf_counter() - started) / 10000 * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
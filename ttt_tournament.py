@@ -0,0 +1,187 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gomoku import SearchPlayer, completes_line, new_board
+from mcts_player import MCTSPlayer
+from ttt_board import WINS, Board
+from ttt_engine import EMPTY, PLAYERS, PerfectPlayer, load_table
+
+STRATEGIES = ("random", "heuristic", "minimax", "mcts")
+
+
+# Plays any legal move, uniformly at random
+class RandomPlayer:
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def choose_move(self, board):
+        return divmod(self.rng.choice(board.legal_moves()), board.cols)
+
+
+# Rule-of-thumb player: win if it can, otherwise block the opponent's win,
+# otherwise take the centre, then a corner, then anything
+class HeuristicPlayer:
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def choose_move(self, board):
+        rows, cols = board.rows, board.cols
+        moves = list(board.legal_moves())
+        urgent = self._winning_move(board, moves, board.turn)
+        if urgent is None:
+            urgent = self._winning_move(board, moves, 1 - board.turn)
+        if urgent is not None:
+            return divmod(urgent, cols)
+        centre = (rows // 2) * cols + cols // 2
+        if board.is_free(centre):
+            return divmod(centre, cols)
+        corners = [i for i in (0, cols - 1, (rows - 1) * cols, rows * cols - 1) if board.is_free(i)]
+        return divmod(self.rng.choice(corners or moves), cols)
+
+    def _winning_move(self, board, moves, turn):
+        # A move completing a line for turn, or None
+        if isinstance(board, Board):
+            mask = board.masks[turn]
+            for i in moves:
+                if WINS[mask | 1 << i]:
+                    return i
+            return None
+        cells = [board.cell(i) for i in range(board.rows * board.cols)]
+        for i in moves:
+            cells[i] = PLAYERS[turn]
+            wins = completes_line(cells, board.rows, board.cols, board.k, i)
+            cells[i] = EMPTY
+            if wins:
+                return i
+        return None
+
+
+def make_player(name, rows=3, cols=3, k=3, rng=None, budget_ms=20):
+    """A computer player by strategy name.  "minimax" is the perfect value
+    table on 3x3 and the alpha-beta search elsewhere; budget_ms limits the
+    search players' time per move."""
+    rng = rng if rng is not None else random.Random()
+    if name == "random":
+        return RandomPlayer(rng)
+    if name == "heuristic":
+        return HeuristicPlayer(rng)
+    if name == "minimax":
+        if (rows, cols, k) == (3, 3, 3):
+            return PerfectPlayer(rng=rng)
+        return SearchPlayer(budget_ms / 1000)
+    if name == "mcts":
+        return MCTSPlayer(budget_ms, workers=0, seed=rng.getrandbits(64))
+    raise ValueError(f"unknown strategy {name!r}")
+
+
+def result(board):
+    """'X' or 'O' once someone has won, 'draw' on a full board, else None."""
+    winner = board.winner()
+    if winner:
+        return winner
+    return "draw" if board.is_full() else None
+
+
+def play_game(board, x_player, o_player):
+    """Play a game from the empty board; returns 'X', 'O' or 'draw'."""
+    players = (x_player, o_player)
+    board.reset()
+    while True:
+        row, col = players[board.turn].choose_move(board)
+        board.make(row * board.cols + col)
+        outcome = result(board)
+        if outcome:
+            return outcome
+
+
+def play_shard(spec):
+    """Play one shard of a pairing; spec is (X strategy, O strategy, games,
+    seed, rows, cols, k, budget_ms).  Returns the spec's pairing with
+    X wins, O wins and draws."""
+    x_name, o_name, games, seed, rows, cols, k, budget_ms = spec
+    board = new_board(rows, cols, k)
+    x_player = make_player(x_name, rows, cols, k, random.Random(seed * 2), budget_ms)
+    o_player = make_player(o_name, rows, cols, k, random.Random(seed * 2 + 1), budget_ms)
+    counts = {'X': 0, 'O': 0, "draw": 0}
+    for _ in range(games):
+        counts[play_game(board, x_player, o_player)] += 1
+    return x_name, o_name, counts['X'], counts['O'], counts["draw"]
+
+
+def add(table, key, record):
+    table[key] = [n + m for n, m in zip(table[key], record)]
+
+
+def print_table(strategies, table):
+    # table[a, b] = [wins, draws, losses] of a against b
+    width = max(12, max(len(name) for name in strategies) + 2)
+    print(f"{'W-D-L':<{width}}" + "".join(f"{name:>{width + 8}}" for name in strategies)
+          + f"{'total':>{width + 8}}")
+    for a in strategies:
+        line = f"{a:<{width}}"
+        overall = [0, 0, 0]
+        for b in strategies:
+            if a == b:
+                line += f"{'-':>{width + 8}}"
+                continue
+            record = table[a, b]
+            overall = [x + y for x, y in zip(overall, record)]
+            line += f"{'-'.join(str(n) for n in record):>{width + 8}}"
+        games = max(1, sum(overall))
+        line += f"{'-'.join(str(n) for n in overall):>{width + 8}}  ({(overall[0] + overall[1] / 2) / games:.1%})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Round-robin tournament between computer strategies.  Every ordered pair "
+                    "plays --games games (so each pair meets with both colours), split into "
+                    "shards over a process pool.  Search strategies are far slower than the "
+                    "others; use fewer games when including mcts or boards larger than 3x3.")
+    parser.add_argument("--strategies", nargs="+", default=["random", "heuristic", "minimax"],
+                        choices=STRATEGIES)
+    parser.add_argument("--games", type=int, default=100000, help="games per ordered pair")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="in a row to win")
+    parser.add_argument("--budget-ms", type=int, default=20, help="time per move for mcts and the alpha-beta search")
+    parser.add_argument("--shard", type=int, default=5000, help="games per pool task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if "minimax" in args.strategies and (args.rows, args.cols, args.k) == (3, 3, 3):
+        load_table()  # build the cache once, not in every worker
+    specs = []
+    for x_name, o_name in itertools.permutations(args.strategies, 2):
+        for start in range(0, args.games, args.shard):
+            specs.append((x_name, o_name, min(args.shard, args.games - start), args.seed + len(specs),
+                          args.rows, args.cols, args.k, args.budget_ms))
+
+    totals = {(a, b): [0, 0, 0] for a, b in itertools.permutations(args.strategies, 2)}
+    by_colour = {(a, b): [0, 0, 0] for a, b in itertools.permutations(args.strategies, 2)}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        for x_name, o_name, x_wins, o_wins, draws in pool.map(play_shard, specs):
+            add(by_colour, (x_name, o_name), (x_wins, draws, o_wins))
+            add(totals, (x_name, o_name), (x_wins, draws, o_wins))
+            add(totals, (o_name, x_name), (o_wins, draws, x_wins))
+    elapsed = time.perf_counter() - started
+    games = sum(spec[2] for spec in specs)
+
+    print(f"{games:,} games on {args.rows}x{args.cols}, {args.k} in a row, in {elapsed:.2f} s with "
+          f"{args.workers} workers ({games / elapsed:,.0f} games/s)", file=sys.stderr)
+    print("Row strategy against column strategy, both colours (score: wins + draws/2):")
+    print_table(args.strategies, totals)
+    print()
+    print("As X (row) against O (column):")
+    print_table(args.strategies, by_colour)
+
+
+if __name__ == "__main__":
+    main()
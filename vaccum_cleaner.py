@@ -1,80 +1,62 @@
+import argparse
 import tkinter as tk
-import random
-
-# Agent class
-class Agent:
-    def __init__(self, env):
-        self.x = 1
-        self.y = 1
-        self.env = env
-        self.cleaned_dirt = 0
-        self.energy_used = 0
-    
-    def move(self, direction):
-        if direction == "UP" and self.env.is_valid_move(self.x, self.y - 1):
-            self.y -= 1
-        elif direction == "DOWN" and self.env.is_valid_move(self.x, self.y + 1):
-            self.y += 1
-        elif direction == "LEFT" and self.env.is_valid_move(self.x - 1, self.y):
-            self.x -= 1
-        elif direction == "RIGHT" and self.env.is_valid_move(self.x + 1, self.y):
-            self.x += 1
-        
-        self.energy_used += 1
-        self.check_for_dirt()
-
-    def check_for_dirt(self):
-        if self.env.is_dirt(self.x, self.y):
-            self.env.clean_dirt(self.x, self.y)
-            self.cleaned_dirt += 1
-            self.energy_used += 2  # Extra energy for cleaning
-
-# Environment class
-class Environment:
-    def __init__(self, width, height):
-        self.width = width
-        self.height = height
-        self.grid = [[0 for _ in range(width)] for _ in range(height)]
-        self.randomize_dirt_and_obstacles()
-
-    def randomize_dirt_and_obstacles(self):
-        # Randomly place dirt
-        for _ in range(10):  # 10 pieces of dirt
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            self.grid[y][x] = 1  # 1 represents dirt
-
-        # Randomly place obstacles
-        for _ in range(5):  # 5 obstacles
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            if self.grid[y][x] == 0:  # Ensure the obstacle is not placed on dirt
-                self.grid[y][x] = 2  # 2 represents an obstacle
-
-    def is_valid_move(self, x, y):
-        # Agent cannot move out of bounds or onto an obstacle
-        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y][x] != 2
-
-    def is_dirt(self, x, y):
-        return self.grid[y][x] == 1
-
-    def clean_dirt(self, x, y):
-        self.grid[y][x] = 0
+import time
+from collections import deque
+
+import numpy as np
+
+from chunked_world import ChunkedGrid
+from flow_field import PlanningAgent
+from vacuum_sim import Agent, Environment, RandomWalk
+from vacuum_trace import RecordingAgent, TraceReplayer
+
+FRAME_MS = 33  # viewer refresh interval, independent of the simulation speed
+CANVAS_SIZE = 300
+VIEW_CELLS = 100  # at most this many cells per side are drawn, following the agent
+AGENT = 3  # colour code of the agent's cell, after the grid's cell values
+COLORS = ("white", "brown", "black", "red")  # clean, dirt, obstacle, agent
 
 # GUI class
 class VacuumCleanerGUI:
-    def __init__(self, root):
+    def __init__(self, root, width=10, height=10, planner=False, record=None, replay=None,
+                 chunked=False, dirt_count=10, obstacle_count=5):
         self.root = root
         self.root.title("Vacuum Cleaner Simulator")
-        self.env = Environment(10, 10)
-        self.agent = Agent(self.env)
+        self.replaying = replay is not None
+        if self.replaying:
+            # A recorded trace stands in for the room, the agent and the
+            # simulation; playback speed follows the delay entry
+            self.env = self.agent = self.sim = TraceReplayer(replay)
+            width, height = self.env.width, self.env.height
+        else:
+            # A chunked grid allocates only the tiles holding dirt or obstacles
+            grid = ChunkedGrid(width, height) if chunked else None
+            self.env = Environment(width, height, dirt_count=dirt_count, obstacle_count=obstacle_count, grid=grid)
+            if record:
+                self.agent = RecordingAgent(self.env, record)
+                self.sim = RandomWalk(self.env, self.agent)
+            elif planner:
+                # Follows the distance field to the nearest dirt; steps itself
+                self.agent = PlanningAgent(self.env)
+                self.sim = self.agent
+            else:
+                self.agent = Agent(self.env)
+                self.sim = RandomWalk(self.env, self.agent)
+        self.pending_steps = 0.0
 
         self.is_running = False  # Flag to control simulation
 
-        self.canvas = tk.Canvas(self.root, width=300, height=300)
+        # Only a viewport around the agent is drawn, so the canvas holds a
+        # fixed number of rectangles whatever the size of the map
+        self.view_width = min(width, VIEW_CELLS)
+        self.view_height = min(height, VIEW_CELLS)
+        self.cell_size = max(1, CANVAS_SIZE // max(self.view_width, self.view_height))
+        self.canvas = tk.Canvas(self.root, width=self.view_width * self.cell_size,
+                                height=self.view_height * self.cell_size)
         self.canvas.grid(row=0, column=0, columnspan=4)
+        self.create_cells()
 
-        self.delay_label = tk.Label(self.root, text="Time Delay (ms):")
+        self.delay_label = tk.Label(self.root, text="Time Delay (ms, 0 = fast):")
         self.delay_label.grid(row=1, column=0)
         self.delay_entry = tk.Entry(self.root)
         self.delay_entry.grid(row=1, column=1)
@@ -91,6 +73,17 @@ class VacuumCleanerGUI:
         self.stats_label = tk.Label(self.root, text="Dirt Cleaned: 0, Energy Used: 0")
         self.stats_label.grid(row=2, column=2, columnspan=2)
 
+        self.frame_times = deque(maxlen=30)
+        self.frame_label = tk.Label(self.root, text="Frame: - ms")
+        self.frame_label.grid(row=3, column=2, columnspan=2)
+
+        if self.replaying:
+            self.seek_scale = tk.Scale(self.root, from_=0, to=self.sim.total_steps, orient=tk.HORIZONTAL,
+                                       label="Step", command=self.seek)
+            self.seek_scale.grid(row=3, column=0, columnspan=2, sticky="we")
+        if record:
+            self.root.protocol("WM_DELETE_WINDOW", self.close)
+
         self.root.bind("<Up>", lambda event: self.move_agent("UP"))
         self.root.bind("<Down>", lambda event: self.move_agent("DOWN"))
         self.root.bind("<Left>", lambda event: self.move_agent("LEFT"))
@@ -99,47 +92,107 @@ class VacuumCleanerGUI:
         self.update_display()
 
     def randomize_dirt(self):
+        if self.replaying:
+            return
         self.env.randomize_dirt_and_obstacles()
+        if isinstance(self.agent, RecordingAgent):
+            self.agent.recorder.keyframe()
         self.update_display()
 
+    def seek(self, value):
+        if int(value) != self.sim.position:
+            self.sim.seek(int(value))
+            self.update_display()
+
+    def close(self):
+        self.agent.recorder.close()
+        self.root.destroy()
+
     def start_simulation(self):
+        if self.is_running:
+            return
         self.is_running = True  # Set flag to True when starting
         delay = int(self.delay_entry.get()) if self.delay_entry.get() else 500
-        self.run_step(delay)
+        self.last_frame = time.perf_counter()
+        self.run_frame(delay)
 
     def stop_simulation(self):
         self.is_running = False  # Set flag to False when stopping
 
-    def run_step(self, delay):
+    def run_frame(self, delay):
+        # The simulation runs in the headless core; each frame advances it by
+        # the steps due since the last frame and then draws the result once
         if not self.is_running:
             return  # Exit if the simulation is stopped
-        direction = random.choice(["UP", "DOWN", "LEFT", "RIGHT"])
-        self.agent.move(direction)
+        now = time.perf_counter()
+        if delay > 0:
+            self.pending_steps += (now - self.last_frame) * 1000 / delay
+            steps = int(self.pending_steps)
+            self.pending_steps -= steps
+            self.sim.step(steps)
+        else:
+            # Fast-forward: simulate for most of the frame
+            deadline = now + FRAME_MS / 1000 * 0.8
+            while time.perf_counter() < deadline:
+                self.sim.step(10000)
+        self.last_frame = now
         self.update_display()
-        self.root.after(delay, lambda: self.run_step(delay))
+        self.root.after(FRAME_MS, lambda: self.run_frame(delay))
 
     def move_agent(self, direction):
+        if self.replaying:
+            return
         self.agent.move(direction)
         self.update_display()
 
+    def create_cells(self):
+        # One rectangle per viewport cell, created once; frames only recolour them
+        size = self.cell_size
+        outline = "black" if size >= 4 else ""
+        self.items = [self.canvas.create_rectangle(x * size, y * size, (x + 1) * size, (y + 1) * size,
+                                                   fill="white", outline=outline)
+                      for y in range(self.view_height) for x in range(self.view_width)]
+        # Colour codes last drawn, 255 so the first frame paints every cell
+        self.shown = np.full(self.view_width * self.view_height, 255, dtype=np.uint8)
+
     def update_display(self):
-        self.canvas.delete("all")
-        cell_size = 30
-        for y in range(self.env.height):
-            for x in range(self.env.width):
-                color = "white"
-                if self.env.is_dirt(x, y):
-                    color = "brown"  # Dirt
-                elif self.env.grid[y][x] == 2:
-                    color = "black"  # Obstacle
-                if self.agent.x == x and self.agent.y == y:
-                    color = "red"  # Agent's position
-                self.canvas.create_rectangle(x * cell_size, y * cell_size, (x + 1) * cell_size, (y + 1) * cell_size, fill=color)
+        started = time.perf_counter()
+        # Viewport centred on the agent where the map allows
+        left = min(max(0, self.agent.x - self.view_width // 2), self.env.width - self.view_width)
+        top = min(max(0, self.agent.y - self.view_height // 2), self.env.height - self.view_height)
+        # Colour code of every viewport cell, then only the cells that differ
+        # from the last frame (agent moved, dirt cleaned, view scrolled) are touched
+        colors = self.env.grid.window(left, top, self.view_width, self.view_height).reshape(-1)
+        colors[(self.agent.y - top) * self.view_width + self.agent.x - left] = AGENT
+        changed = np.flatnonzero(colors != self.shown)
+        for i, code in zip(changed.tolist(), colors[changed].tolist()):
+            self.canvas.itemconfig(self.items[i], fill=COLORS[code])
+        self.shown = colors
 
         # Update stats label
         self.stats_label.config(text=f"Dirt Cleaned: {self.agent.cleaned_dirt}, Energy Used: {self.agent.energy_used}")
 
+        self.frame_times.append(time.perf_counter() - started)
+        average = sum(self.frame_times) / len(self.frame_times)
+        self.frame_label.config(text=f"Frame: {average * 1000:.2f} ms ({len(changed)} cells), view at ({left}, {top})")
+        if self.replaying:
+            self.seek_scale.set(self.sim.position)
+
 # Main
-root = tk.Tk()
-gui = VacuumCleanerGUI(root)
-root.mainloop()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vacuum cleaner simulator")
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=10)
+    parser.add_argument("--planner", action="store_true", help="walk towards the nearest dirt instead of at random")
+    parser.add_argument("--record", metavar="PATH", help="record the random walk to a trace file")
+    parser.add_argument("--replay", metavar="PATH", help="play back a trace file instead of simulating")
+    parser.add_argument("--chunked", action="store_true", help="store the map in tiles, for very large maps")
+    parser.add_argument("--dirt", type=int, default=10, help="dirty cells scattered at random")
+    parser.add_argument("--obstacles", type=int, default=5, help="obstacles scattered at random")
+    args = parser.parse_args()
+    if args.chunked and (args.planner or args.record):
+        parser.error("--chunked works with the random walk only")
+    root = tk.Tk()
+    gui = VacuumCleanerGUI(root, args.width, args.height, args.planner, args.record, args.replay,
+                           args.chunked, args.dirt, args.obstacles)
+    root.mainloop()
@@ -1,101 +1,91 @@
+import argparse
 import tkinter as tk
-import random
-import time
+
+import numpy as np
+
+from chunked_world import ChunkedGrid
+from vacuum_sim import TourCleaner
+
+VIEW_CELLS = 10  # cells per side drawn around the vacuum
+COLORS = ("lightgrey", "brown")  # clean, dirt
 
 class VacuumCleanerApp:
-    def __init__(self, root):
+    def __init__(self, root, rows=10, cols=10, dirt_count=15, chunked=False):
         self.root = root
         self.root.title("Vacuum Cleaner Simulation")
         
-        # Define the grid dimensions
-        self.rows = 10
-        self.cols = 10
+        # Define the grid dimensions; only a view of at most VIEW_CELLS
+        # per side is drawn, so big rooms cost no more canvas items
+        self.rows = rows
+        self.cols = cols
+        self.view_rows = min(rows, VIEW_CELLS)
+        self.view_cols = min(cols, VIEW_CELLS)
         self.cell_size = 50
         
         # Create canvas to draw the room grid
-        self.canvas = tk.Canvas(root, width=self.cols * self.cell_size, height=self.rows * self.cell_size)
+        self.canvas = tk.Canvas(root, width=self.view_cols * self.cell_size, height=self.view_rows * self.cell_size)
         self.canvas.pack()
         
-        # Draw the grid cells
-        self.cells = {}
-        for i in range(self.rows):
-            for j in range(self.cols):
+        # Draw the view's cells once; frames only recolour them
+        self.cells = []
+        for i in range(self.view_rows):
+            for j in range(self.view_cols):
                 x1, y1 = j * self.cell_size, i * self.cell_size
                 x2, y2 = x1 + self.cell_size, y1 + self.cell_size
-                cell = self.canvas.create_rectangle(x1, y1, x2, y2, fill="lightgrey", outline="black")
-                self.cells[(i, j)] = cell
+                self.cells.append(self.canvas.create_rectangle(x1, y1, x2, y2, fill="lightgrey", outline="black"))
+        self.shown = np.zeros(self.view_rows * self.view_cols, dtype=np.uint8)  # colour codes on screen
         
         # Vacuum cleaner's starting position
-        self.vacuum_position = [0, 0]
         self.vacuum = self.canvas.create_oval(0, 0, self.cell_size, self.cell_size, fill="blue")
         
-        # Randomly "dirty" some cells
-        self.dirty_cells = random.sample(list(self.cells.keys()), k=15)
-        for cell in self.dirty_cells:
-            self.canvas.itemconfig(self.cells[cell], fill="brown")
+        # The simulation itself runs headless; this window only draws it.
+        # It dirties some cells at random and plans the visiting order once.
+        grid = ChunkedGrid(cols, rows) if chunked else None
+        self.sim = TourCleaner(rows, cols, dirt_count=dirt_count, grid=grid)
+        planned_steps, greedy_steps = self.sim.compare_with_greedy()
         
         # Label to display status
         self.status_label = tk.Label(root, text="Automatic vacuum in progress...", font=("Arial", 12))
         self.status_label.pack()
+        self.plan_label = tk.Label(root, text=f"Planned tour: {planned_steps} steps, greedy: {greedy_steps} steps "
+                                              f"(saved {greedy_steps - planned_steps})", font=("Arial", 10))
+        self.plan_label.pack()
+        
+        self.update_vacuum_position()
         
         # Start the automatic cleaning process
         self.cleaning_in_progress = True
         self.root.after(1000, self.auto_clean)  # Start after 1 second
 
     def update_vacuum_position(self):
-        # Update the vacuum cleaner's position in the grid
-        row, col = self.vacuum_position
-        x1, y1 = col * self.cell_size, row * self.cell_size
+        # Keep the view centred on the vacuum where the room allows
+        row, col = self.sim.position
+        top = min(max(0, row - self.view_rows // 2), self.rows - self.view_rows)
+        left = min(max(0, col - self.view_cols // 2), self.cols - self.view_cols)
+        
+        # Update the vacuum cleaner's position in the view
+        x1, y1 = (col - left) * self.cell_size, (row - top) * self.cell_size
         x2, y2 = x1 + self.cell_size, y1 + self.cell_size
         self.canvas.coords(self.vacuum, x1, y1, x2, y2)
         
-        # Clean the cell if it's dirty
-        if tuple(self.vacuum_position) in self.dirty_cells:
-            self.dirty_cells.remove(tuple(self.vacuum_position))
-            self.canvas.itemconfig(self.cells[tuple(self.vacuum_position)], fill="lightgrey")
+        # Repaint the cells that changed since the last frame (cleaned, or
+        # scrolled into view)
+        colors = self.sim.grid.window(left, top, self.view_cols, self.view_rows).reshape(-1)
+        changed = np.flatnonzero(colors != self.shown)
+        for i, code in zip(changed.tolist(), colors[changed].tolist()):
+            self.canvas.itemconfig(self.cells[i], fill=COLORS[code])
+        self.shown = colors
         
         # Check if all cells are clean
-        if not self.dirty_cells:
+        if self.sim.done:
             self.status_label.config(text="All cells are clean! Vacuum cleaner job is done.")
             self.cleaning_in_progress = False
 
-    def move_vacuum(self, target_row, target_col):
-        """Move the vacuum cleaner step-by-step to the target position."""
-        current_row, current_col = self.vacuum_position
-        
-        if current_row < target_row:
-            self.vacuum_position[0] += 1
-        elif current_row > target_row:
-            self.vacuum_position[0] -= 1
-        elif current_col < target_col:
-            self.vacuum_position[1] += 1
-        elif current_col > target_col:
-            self.vacuum_position[1] -= 1
-        
-        self.update_vacuum_position()
-
-    def find_closest_dirty_cell(self):
-        """Find the closest dirty cell to the vacuum's current position."""
-        current_row, current_col = self.vacuum_position
-        closest_cell = None
-        min_distance = float('inf')
-        
-        for dirty_cell in self.dirty_cells:
-            dirty_row, dirty_col = dirty_cell
-            distance = abs(current_row - dirty_row) + abs(current_col - dirty_col)
-            if distance < min_distance:
-                min_distance = distance
-                closest_cell = dirty_cell
-                
-        return closest_cell
-
     def auto_clean(self):
-        """Automatically clean the room by moving towards dirty cells."""
-        if self.cleaning_in_progress and self.dirty_cells:
-            closest_dirty_cell = self.find_closest_dirty_cell()
-            if closest_dirty_cell:
-                target_row, target_col = closest_dirty_cell
-                self.move_vacuum(target_row, target_col)
+        """Automatically clean the room by following the planned tour."""
+        if self.cleaning_in_progress and not self.sim.done:
+            self.sim.step()
+            self.update_vacuum_position()
             
             # Call this method again to continue cleaning after a short delay
             self.root.after(200, self.auto_clean)
@@ -103,6 +93,12 @@ class VacuumCleanerApp:
             self.status_label.config(text="All cells are clean! Vacuum cleaner job is done.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vacuum cleaner following a planned tour")
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--dirt", type=int, default=15, help="dirty cells scattered at random")
+    parser.add_argument("--chunked", action="store_true", help="store the room in tiles, for very large rooms")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = VacuumCleanerApp(root)
+    app = VacuumCleanerApp(root, args.rows, args.cols, args.dirt, args.chunked)
     root.mainloop()
@@ -0,0 +1,244 @@
+import argparse
+import time
+
+import numpy as np
+
+from dirt_index import DirtIndex
+from grid_state import CLEAN, DIRT, OBSTACLE, GridState
+from tour_planner import count_steps, plan_tour
+
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+# Column and row offsets of each direction, in DIRECTIONS order
+DX = (0, 0, -1, 1)
+DY = (-1, 1, 0, 0)
+
+# Directions drawn per batch by RandomWalk.step; BatchRandomWalk draws in
+# the same blocks so that both consume identical random streams
+CHUNK = 4096
+
+
+# Agent class
+class Agent:
+    def __init__(self, env):
+        self.x = 1
+        self.y = 1
+        self.env = env
+        self.cleaned_dirt = 0
+        self.energy_used = 0
+
+    def move(self, direction):
+        if direction == "UP" and self.env.is_valid_move(self.x, self.y - 1):
+            self.y -= 1
+        elif direction == "DOWN" and self.env.is_valid_move(self.x, self.y + 1):
+            self.y += 1
+        elif direction == "LEFT" and self.env.is_valid_move(self.x - 1, self.y):
+            self.x -= 1
+        elif direction == "RIGHT" and self.env.is_valid_move(self.x + 1, self.y):
+            self.x += 1
+
+        self.energy_used += 1
+        self.check_for_dirt()
+
+    def check_for_dirt(self):
+        if self.env.is_dirt(self.x, self.y):
+            self.env.clean_dirt(self.x, self.y)
+            self.cleaned_dirt += 1
+            self.energy_used += 2  # Extra energy for cleaning
+
+
+# Environment class
+class Environment:
+    def __init__(self, width, height, rng=None, dirt_count=10, obstacle_count=5, grid=None):
+        self.width = width
+        self.height = height
+        self.dirt_count = dirt_count
+        self.obstacle_count = obstacle_count
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # 0 clean, 1 dirt, 2 obstacle; any grid with the GridState cell API,
+        # such as a ChunkedGrid for very large maps
+        self.grid = grid if grid is not None else GridState(width, height)
+        self.randomize_dirt_and_obstacles()
+
+    def randomize_dirt_and_obstacles(self):
+        # Dirt (10 pieces by default), then obstacles that are not placed on dirt
+        self.grid.randomize(self.dirt_count, self.obstacle_count, self.rng)
+
+    def is_valid_move(self, x, y):
+        # Agent cannot move out of bounds or onto an obstacle
+        return 0 <= x < self.width and 0 <= y < self.height and not self.grid.is_obstacle(x, y)
+
+    def is_dirt(self, x, y):
+        return self.grid.is_dirt(x, y)
+
+    def clean_dirt(self, x, y):
+        self.grid.clean(x, y)
+
+
+# Random-walk agent without a GUI: step(n) draws n directions at once and
+# runs Agent.move semantics in a tight loop over the grid's flat buffer.
+class RandomWalk:
+    def __init__(self, env, agent=None, seed=None):
+        self.env = env
+        self.agent = agent if agent is not None else Agent(env)
+        self.rng = np.random.default_rng(seed)
+        self.steps = 0
+
+    def step(self, n=1, until_clean=False):
+        """Advance n steps; returns the number of cells cleaned.
+
+        With until_clean the walk stops right after cleaning the last dirt.
+        """
+        cleaned = 0
+        dirt_left = self.env.grid.dirt_count() if until_clean else None
+        while n > 0 and dirt_left != 0:
+            count = min(n, CHUNK)
+            done = self.run(self.rng.integers(0, 4, count, dtype=np.uint8).tolist(), dirt_left)
+            cleaned += done
+            if dirt_left is not None:
+                dirt_left -= done
+            n -= count
+        return cleaned
+
+    def run(self, directions, limit=None):
+        """Apply a sequence of direction indices into DIRECTIONS, stopping
+        early once limit cells have been cleaned."""
+        agent = self.agent
+        grid = self.env.grid
+        before = agent.cleaned_dirt
+        if type(self.env) is not Environment or type(agent) is not Agent or not isinstance(grid, GridState):
+            # Subclassed environments or agents may change the rules (or
+            # record the moves); go through move()
+            for d in directions:
+                agent.move(DIRECTIONS[d])
+                self.steps += 1
+                if agent.cleaned_dirt - before == limit:
+                    break
+            return agent.cleaned_dirt - before
+
+        flat = grid.flat
+        width, height = grid.width, grid.height
+        x, y = agent.x, agent.y
+        cleaned = energy = 0
+        taken = len(directions)
+        for step, d in enumerate(directions):
+            nx = x + DX[d]
+            ny = y + DY[d]
+            if 0 <= nx < width and 0 <= ny < height and flat[ny * width + nx] != OBSTACLE:
+                x, y = nx, ny
+            i = y * width + x
+            if flat[i] == DIRT:
+                flat[i] = CLEAN
+                cleaned += 1
+                energy += 2
+                if cleaned == limit:
+                    taken = step + 1
+                    break
+        agent.x, agent.y = x, y
+        agent.cleaned_dirt += cleaned
+        agent.energy_used += energy + taken
+        self.steps += taken
+        return cleaned
+
+def random_walk_episode(width, height, seed):
+    """RandomWalk in a fresh room, both generated from one seed."""
+    env_seed, walk_seed = np.random.SeedSequence(seed).spawn(2)
+    env = Environment(width, height, np.random.default_rng(env_seed))
+    return RandomWalk(env, seed=walk_seed)
+
+
+# The VacuumCleanerApp simulation without Tk: a rows x cols room of distinct
+# dirty cells, cleaned by walking one row or column per step towards the
+# next cell of a planned tour (or, with plan off, the nearest dirty cell).
+class TourCleaner:
+    def __init__(self, rows, cols, dirt_count=15, seed=None, plan=True, time_budget=0.5, grid=None):
+        self.rows = rows
+        self.cols = cols
+        self.grid = grid if grid is not None else GridState(cols, rows)
+        self.grid.randomize(dirt_count, 0, np.random.default_rng(seed), distinct=True)
+        self.dirty_cells = DirtIndex(self.grid.dirty_cells())
+        self.position = [0, 0]
+        self.steps = 0
+        self.cleaned = []  # (row, col) in the order the cells were cleaned
+        start = tuple(self.position)
+        self.tour = plan_tour(start, list(self.dirty_cells), time_budget) if plan else None
+        self.tour_index = 0
+
+    @property
+    def done(self):
+        return not self.dirty_cells
+
+    def compare_with_greedy(self):
+        """(planned, greedy) step counts from the starting position."""
+        start = (0, 0)
+        cells = list(self.dirty_cells) + self.cleaned
+        return count_steps(start, cells, self.tour), count_steps(start, cells)
+
+    def find_closest_dirty_cell(self):
+        """Find the closest dirty cell to the vacuum's current position."""
+        current_row, current_col = self.position
+        return self.dirty_cells.nearest(current_row, current_col)
+
+    def next_tour_cell(self):
+        """Next cell of the planned tour that is still dirty."""
+        while self.tour and self.tour_index < len(self.tour):
+            row, col = self.tour[self.tour_index]
+            if self.grid.is_dirt(col, row):
+                return (row, col)
+            self.tour_index += 1
+        return self.find_closest_dirty_cell()
+
+    def move_vacuum(self, target_row, target_col):
+        """Move one row or column towards the target and clean the cell there."""
+        position = self.position
+        if position[0] < target_row:
+            position[0] += 1
+        elif position[0] > target_row:
+            position[0] -= 1
+        elif position[1] < target_col:
+            position[1] += 1
+        elif position[1] > target_col:
+            position[1] -= 1
+        self.steps += 1
+
+        row, col = position
+        if self.grid.is_dirt(col, row):
+            self.grid.clean(col, row)
+            self.dirty_cells.remove((row, col))
+            self.cleaned.append((row, col))
+
+    def step(self, n=1):
+        """Advance up to n steps, stopping early once everything is clean."""
+        for _ in range(n):
+            if not self.dirty_cells:
+                break
+            self.move_vacuum(*self.next_tour_cell())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the vacuum simulations headless and report their speed")
+    parser.add_argument("--size", type=int, default=100, help="room width and height")
+    parser.add_argument("--steps", type=int, default=2000000, help="random-walk steps")
+    parser.add_argument("--dirt", type=int, default=500, help="dirty cells for the tour cleaner")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = Environment(args.size, args.size, np.random.default_rng(args.seed))
+    walk = RandomWalk(env, seed=args.seed)
+    started = time.perf_counter()
+    walk.step(args.steps)
+    elapsed = time.perf_counter() - started
+    agent = walk.agent
+    print(f"random walk: {args.steps:,} steps in {elapsed:.2f} s ({args.steps / elapsed:,.0f} steps/s), "
+          f"cleaned {agent.cleaned_dirt}, energy {agent.energy_used}")
+
+    cleaner = TourCleaner(args.size, args.size, args.dirt, seed=args.seed)
+    started = time.perf_counter()
+    while not cleaner.done:
+        cleaner.step(10000)
+    elapsed = time.perf_counter() - started
+    print(f"tour cleaner: {cleaner.steps:,} steps in {elapsed:.2f} s ({cleaner.steps / elapsed:,.0f} steps/s), "
+          f"cleaned {len(cleaner.cleaned)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import bisect
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from grid_state import CLEAN, GridState
+from vacuum_sim import Agent, Environment, RandomWalk, TourCleaner
+
+# File layout (little-endian):
+#   header   magic, width, height
+#   blocks   each: BLOCK header, zlib(grid cells), zlib(one byte per step)
+# A block starts with a keyframe: the full grid and the agent's state before
+# its first step.  Blocks are closed every keyframe_interval steps, and also
+# whenever the grid changed outside a step (e.g. dirt was randomized), so
+# any step can be reached by decoding at most one block.
+MAGIC = b"VTRACE01"
+HEADER = struct.Struct("<8sII")
+BLOCK = struct.Struct("<qqqqqqII")  # first step, steps, x, y, cleaned, energy, grid size, delta size
+KEYFRAME_INTERVAL = 1 << 16
+
+# One byte per step: bits 0-2 the move (an index into these offsets; 0 is
+# "stayed put") and bit 3 set when the cell moved onto was cleaned
+MOVE_X = (0, 0, 0, -1, 1)
+MOVE_Y = (0, -1, 1, 0, 0)
+MOVE_CODE = {(dx, dy): code for code, (dx, dy) in enumerate(zip(MOVE_X, MOVE_Y))}
+MOVE_XS = np.array(MOVE_X)
+MOVE_YS = np.array(MOVE_Y)
+CLEANED = 8
+
+
+class TraceRecorder:
+    def __init__(self, path, grid, x, y, cleaned=0, energy=0, keyframe_interval=KEYFRAME_INTERVAL):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, grid.width, grid.height))
+        self.grid = grid
+        self.keyframe_interval = keyframe_interval
+        # Agent state as of the end of the recorded steps
+        self.steps = 0
+        self.x, self.y = x, y
+        self.cleaned = cleaned
+        self.energy = energy
+        self._open_block()
+
+    def _open_block(self):
+        self.block_start = (self.steps, self.x, self.y, self.cleaned, self.energy)
+        self.block_grid = zlib.compress(self.grid.cells.tobytes(), 6)
+        self.deltas = bytearray()
+
+    def _close_block(self):
+        data = zlib.compress(bytes(self.deltas), 9)
+        self.file.write(BLOCK.pack(self.block_start[0], len(self.deltas), *self.block_start[1:],
+                                   len(self.block_grid), len(data)))
+        self.file.write(self.block_grid)
+        self.file.write(data)
+
+    def record(self, dx, dy, cleaned):
+        """Log one step: the move made and whether it cleaned the new cell."""
+        self.deltas.append(MOVE_CODE[dx, dy] | (CLEANED if cleaned else 0))
+        self.steps += 1
+        self.x += dx
+        self.y += dy
+        self.energy += 3 if cleaned else 1
+        if cleaned:
+            self.cleaned += 1
+        if len(self.deltas) >= self.keyframe_interval:
+            self.keyframe()
+
+    def keyframe(self):
+        """Start a new block from the grid as it is now; call after changing
+        the grid outside a recorded step."""
+        if self.deltas:
+            self._close_block()
+        self._open_block()
+
+    def close(self):
+        self._close_block()
+        self.file.close()
+
+
+# Agent whose moves are written to a TraceRecorder
+class RecordingAgent(Agent):
+    def __init__(self, env, path, keyframe_interval=KEYFRAME_INTERVAL):
+        super().__init__(env)
+        self.recorder = TraceRecorder(path, env.grid, self.x, self.y, keyframe_interval=keyframe_interval)
+
+    def move(self, direction):
+        x, y, cleaned = self.x, self.y, self.cleaned_dirt
+        super().move(direction)
+        self.recorder.record(self.x - x, self.y - y, self.cleaned_dirt != cleaned)
+
+
+# TourCleaner whose moves are written to a TraceRecorder
+class RecordingTourCleaner(TourCleaner):
+    def __init__(self, rows, cols, path, keyframe_interval=KEYFRAME_INTERVAL, **options):
+        super().__init__(rows, cols, **options)
+        row, col = self.position
+        self.recorder = TraceRecorder(path, self.grid, col, row, keyframe_interval=keyframe_interval)
+
+    def move_vacuum(self, target_row, target_col):
+        row, col = self.position
+        cleaned = len(self.cleaned)
+        super().move_vacuum(target_row, target_col)
+        self.recorder.record(self.position[1] - col, self.position[0] - row, len(self.cleaned) != cleaned)
+
+
+# Plays a trace back from its keyframes and deltas, without re-running the
+# simulation.  Exposes the attributes the vacuum viewer reads (grid, x, y,
+# cleaned_dirt, energy_used) and a step(n) that advances playback.
+class TraceReplayer:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, self.width, self.height = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a vacuum trace file")
+        self.blocks = []
+        offset = HEADER.size
+        while offset < len(self.data):
+            block = BLOCK.unpack_from(self.data, offset)
+            offset += BLOCK.size
+            grid_size, delta_size = block[6], block[7]
+            self.blocks.append(block[:6] + (offset, grid_size, offset + grid_size, delta_size))
+            offset += grid_size + delta_size
+        self.starts = [block[0] for block in self.blocks]
+        self.total_steps = self.blocks[-1][0] + self.blocks[-1][1]
+        self.grid = GridState(self.width, self.height)
+        self._block = None
+        self.seek(0)
+
+    def _load(self, index):
+        # Restore the keyframe at the start of a block
+        start, steps, x, y, cleaned, energy, grid_at, grid_size, delta_at, delta_size = self.blocks[index]
+        cells = zlib.decompress(self.data[grid_at:grid_at + grid_size])
+        self.grid.cells[...] = np.frombuffer(cells, dtype=np.uint8).reshape(self.height, self.width)
+        self._block = index
+        self._codes = np.frombuffer(zlib.decompress(self.data[delta_at:delta_at + delta_size]), dtype=np.uint8)
+        self.position = start
+        self.x, self.y = x, y
+        self.cleaned_dirt = cleaned
+        self.energy_used = energy
+
+    def seek(self, step):
+        """Jump to the state after the given number of steps."""
+        step = max(0, min(step, self.total_steps))
+        index = bisect.bisect_right(self.starts, step) - 1
+        if index != self._block or self.position > step:
+            self._load(index)
+        self._apply(step - self.position)
+
+    def step(self, n=1):
+        """Play up to n steps forward; returns the number played."""
+        played = 0
+        while played < n and self.position < self.total_steps:
+            start, steps = self.blocks[self._block][:2]
+            if self.position == start + steps:
+                self._load(self._block + 1)
+                continue
+            count = min(n - played, start + steps - self.position)
+            self._apply(count)
+            played += count
+        return played
+
+    def _apply(self, count):
+        if count <= 0:
+            return
+        offset = self.position - self.blocks[self._block][0]
+        codes = self._codes[offset:offset + count]
+        moves = codes & 7
+        xs = self.x + np.cumsum(MOVE_XS[moves])
+        ys = self.y + np.cumsum(MOVE_YS[moves])
+        cleaned = (codes & CLEANED) != 0
+        self.grid.cells[ys[cleaned], xs[cleaned]] = CLEAN
+        self.x, self.y = int(xs[-1]), int(ys[-1])
+        done = int(np.count_nonzero(cleaned))
+        self.cleaned_dirt += done
+        self.energy_used += count + 2 * done
+        self.position += count
+
+
+def record(args):
+    if args.tour:
+        cleaner = RecordingTourCleaner(args.size, args.size, args.out, args.keyframe_interval,
+                                       dirt_count=args.dirt, seed=args.seed)
+        started = time.perf_counter()
+        while not cleaner.done and cleaner.steps < args.steps:
+            cleaner.step(min(10000, args.steps - cleaner.steps))
+        recorder = cleaner.recorder
+    else:
+        env = Environment(args.size, args.size, np.random.default_rng(args.seed),
+                          dirt_count=args.dirt, obstacle_count=args.size * args.size // 20)
+        agent = RecordingAgent(env, args.out, args.keyframe_interval)
+        walk = RandomWalk(env, agent, seed=args.seed)
+        started = time.perf_counter()
+        walk.step(args.steps)
+        recorder = agent.recorder
+    recorder.close()
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(args.out)
+    print(f"recorded {recorder.steps:,} steps in {elapsed:.2f} s to {args.out}: "
+          f"{size / 1e6:.2f} MB ({size * 8 / max(1, recorder.steps):.2f} bits/step)")
+
+
+def replay(args):
+    started = time.perf_counter()
+    replayer = TraceReplayer(args.trace)
+    print(f"{replayer.total_steps:,} steps in {len(replayer.blocks)} blocks, "
+          f"opened in {(time.perf_counter() - started) * 1000:.1f} ms")
+    rng = np.random.default_rng(0)
+    targets = rng.integers(0, replayer.total_steps + 1, args.seeks)
+    started = time.perf_counter()
+    for step in targets.tolist():
+        replayer.seek(step)
+    elapsed = time.perf_counter() - started
+    print(f"{args.seeks} random seeks: {elapsed / max(1, args.seeks) * 1000:.2f} ms each")
+
+    replayer.seek(0)
+    started = time.perf_counter()
+    while replayer.step(args.speed):
+        pass
+    elapsed = time.perf_counter() - started
+    print(f"played to the end {args.speed:,} steps at a time in {elapsed:.2f} s: "
+          f"position ({replayer.x}, {replayer.y}), cleaned {replayer.cleaned_dirt}, energy {replayer.energy_used}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay vacuum simulation traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="record a headless run")
+    rec.add_argument("out")
+    rec.add_argument("--size", type=int, default=100)
+    rec.add_argument("--steps", type=int, default=4000000)
+    rec.add_argument("--dirt", type=int, default=500)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--tour", action="store_true", help="record the tour cleaner instead of the random walk")
+    rec.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+    play = commands.add_parser("replay", help="time seeking and playback of a trace")
+    play.add_argument("trace")
+    play.add_argument("--seeks", type=int, default=200)
+    play.add_argument("--speed", type=int, default=1000, help="steps per playback frame")
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args)
+    else:
+        replay(args)
+
+
+if __name__ == "__main__":
+    main()